@@ -0,0 +1,224 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    frames INTEGER DEFAULT 0,
+    reps INTEGER DEFAULT 0,
+    mean_accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_exercise_time ON sessions (user_id, exercise, started_at);
+
+CREATE TABLE IF NOT EXISTS reps (
+    session_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    min_angle REAL,
+    max_angle REAL,
+    range_of_motion REAL,
+    mean_accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS idx_reps_user_exercise_time ON reps (user_id, exercise, started_at);
+CREATE INDEX IF NOT EXISTS idx_reps_session ON reps (session_id);
+
+CREATE TABLE IF NOT EXISTS frame_metrics (
+    session_id TEXT NOT NULL,
+    t REAL NOT NULL,
+    accuracy REAL,
+    hip REAL,
+    knee REAL,
+    elbow REAL,
+    shoulder REAL
+);
+CREATE INDEX IF NOT EXISTS idx_frame_metrics_session_time ON frame_metrics (session_id, t);
+"""
+
+INSERT_SESSION = "INSERT INTO sessions (id, user_id, exercise, started_at) VALUES (?, ?, ?, ?)"
+END_SESSION = "UPDATE sessions SET ended_at = ?, frames = ?, reps = ?, mean_accuracy = ? WHERE id = ?"
+INSERT_REP = "INSERT INTO reps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_FRAME = "INSERT INTO frame_metrics VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+class AnalyticsStore:
+    """
+    Local SQLite store for session, rep and downsampled per-frame metrics.
+    All writes are queued and committed in batches by a background thread,
+    so recording never waits on the disk. History queries use their own
+    connection and run concurrently thanks to WAL mode.
+    """
+    def __init__(self, path, frame_interval=1.0, batch_size=500, flush_interval=1.0, max_queue=10000):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.frame_interval = frame_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        # Per-session aggregates, only touched by the recording thread
+        self.sessions = {}
+
+        conn = self.connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _put(self, sql, params):
+        try:
+            self.queue.put_nowait((sql, params))
+        except queue.Full:
+            self.dropped += 1
+
+    def start_session(self, user_id, exercise):
+        """Open a session and return its id"""
+        session_id = uuid.uuid4().hex
+        started_at = time.time()
+        self.sessions[session_id] = {
+            'user_id': user_id, 'exercise': exercise, 'frames': 0, 'reps': 0,
+            'accuracy_sum': 0.0, 'bucket_start': None, 'bucket': None
+        }
+        self._put(INSERT_SESSION, (session_id, user_id, exercise, started_at))
+        return session_id
+
+    def record_frame(self, session_id, accuracy, angles, timestamp=None):
+        """Add one frame; frames are averaged into one row per `frame_interval` seconds"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        session['frames'] += 1
+        session['accuracy_sum'] += accuracy
+
+        values = (accuracy, angles.get('Hip'), angles.get('Knee'), angles.get('Elbow'), angles.get('Shoulder'))
+        if session['bucket'] is None:
+            session['bucket_start'] = timestamp
+            session['bucket'] = ([0.0] * len(values), [0] * len(values))
+        sums, counts = session['bucket']
+        for i, v in enumerate(values):
+            # Missing angles (absent or NaN) are left out of the average instead of counting as 0
+            if v is not None and v == v:
+                sums[i] += v
+                counts[i] += 1
+        if timestamp - session['bucket_start'] >= self.frame_interval:
+            self._flush_bucket(session_id, session)
+
+    def _flush_bucket(self, session_id, session):
+        sums, counts = session['bucket']
+        # NULL for columns with no samples in this bucket
+        means = tuple(total / n if n else None for total, n in zip(sums, counts))
+        self._put(INSERT_FRAME, (session_id, session['bucket_start']) + means)
+        session['bucket'] = None
+
+    def record_rep(self, session_id, started_at, ended_at, min_angle, max_angle, mean_accuracy):
+        """Add one completed rep"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session['reps'] += 1
+        self._put(INSERT_REP, (
+            session_id, session['user_id'], session['exercise'], started_at, ended_at,
+            min_angle, max_angle, max_angle - min_angle, mean_accuracy
+        ))
+
+    def end_session(self, session_id):
+        """Write the session summary"""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        if session['bucket'] is not None:
+            self._flush_bucket(session_id, session)
+        mean_accuracy = session['accuracy_sum'] / session['frames'] if session['frames'] else None
+        self._put(END_SESSION, (time.time(), session['frames'], session['reps'], mean_accuracy, session_id))
+
+    def close(self):
+        """Flush everything still queued and stop the writer"""
+        for session_id in list(self.sessions):
+            self.end_session(session_id)
+        self.queue.put(None)
+        self.thread.join()
+
+    def _write_loop(self):
+        conn = self.connect()
+        running = True
+        while running:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            if not batch:
+                continue
+            try:
+                with conn:
+                    # Group consecutive statements of the same kind into executemany calls
+                    start = 0
+                    for i in range(1, len(batch) + 1):
+                        if i == len(batch) or batch[i][0] != batch[start][0]:
+                            conn.executemany(batch[start][0], [params for _, params in batch[start:i]])
+                            start = i
+            except sqlite3.Error as e:
+                print(f"Analytics write failed: {e}")
+        conn.close()
+
+    def query(self, sql, params=()):
+        """Run a read query on a short-lived connection"""
+        conn = self.connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def accuracy_trend(self, user_id, exercise, days=90):
+        """Daily (date, mean accuracy, sessions) for a user and exercise over the last `days`"""
+        return self.query(
+            """
+            SELECT date(started_at, 'unixepoch', 'localtime') AS day, AVG(mean_accuracy), COUNT(*)
+            FROM sessions
+            WHERE user_id = ? AND exercise = ? AND started_at >= ?
+            GROUP BY day ORDER BY day
+            """,
+            (user_id, exercise, time.time() - days * 86400)
+        )
+
+    def rep_history(self, user_id, exercise, days=90):
+        """(started_at, range_of_motion, duration, mean accuracy) of every rep over the last `days`"""
+        return self.query(
+            """
+            SELECT started_at, range_of_motion, ended_at - started_at, mean_accuracy
+            FROM reps
+            WHERE user_id = ? AND exercise = ? AND started_at >= ?
+            ORDER BY started_at
+            """,
+            (user_id, exercise, time.time() - days * 86400)
+        )
+
+    def session_frames(self, session_id):
+        """Downsampled per-frame metrics of one session"""
+        return self.query(
+            "SELECT t, accuracy, hip, knee, elbow, shoulder FROM frame_metrics WHERE session_id = ? ORDER BY t",
+            (session_id,)
+        )
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+
+try:
+    import simpleaudio
+except ImportError:  # playback is optional, cues are skipped without it
+    simpleaudio = None
+
+try:
+    import pyttsx3
+except ImportError:  # synthesis is optional, only already cached clips are played
+    pyttsx3 = None
+
+CUE_PRIORITY = {'error': 0, 'warning': 1, 'good': 2}
+
+
+class CueScheduler:
+    """
+    Spoken coaching cues that never block the capture loop.
+
+    submit() only hands the latest feedback list to a dedicated audio thread.
+    That list stays the standing state until it changes: the audio thread
+    speaks its most important message and waits for the clip to finish, as
+    playback itself does not block. It then sleeps until the gap after the
+    end of that cue or a message's repeat cooldown runs out and looks at the
+    feedback again, so a correction that stays on is repeated and other
+    messages get their turn.
+    Clips are pre-rendered and held in memory. Phrases without a clip are
+    synthesized to the on-disk cache by a separate thread, which wakes the
+    audio thread once they are playable.
+    """
+    def __init__(self, cache_dir, min_gap=1.5, repeat_after=8.0, good_repeat_after=30.0):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.min_gap = min_gap
+        self.repeat_after = repeat_after
+        self.good_repeat_after = good_repeat_after
+        self.enabled = simpleaudio is not None
+
+        self.clips = {}
+        self.last_spoken = {}
+        self.last_cue = 0.0
+        self.feedback = None
+        self.rendered = 0
+        self.condition = threading.Condition()
+        self.running = True
+        self.synth_queue = queue.Queue()
+        self.synth_requested = set()
+
+        self.played = 0
+        self.suppressed = 0
+
+        self.audio_thread = threading.Thread(target=self._audio_loop, name='audio-cues', daemon=True)
+        self.synth_thread = threading.Thread(target=self._synth_loop, name='audio-synth', daemon=True)
+        if self.enabled:
+            self.audio_thread.start()
+            self.synth_thread.start()
+
+    def clip_path(self, text):
+        return os.path.join(self.cache_dir, hashlib.sha1(text.encode()).hexdigest() + '.wav')
+
+    def precache(self, texts):
+        """Queue phrases for offline synthesis, e.g. every message of the rule sets"""
+        for text in texts:
+            self._ensure_clip(text)
+
+    def submit(self, feedback):
+        """Offer the current feedback list; cheap enough to call every frame"""
+        # The rule engine returns the same list object until something changes
+        if not self.enabled or feedback is self.feedback:
+            return
+        with self.condition:
+            self.feedback = feedback
+            self.condition.notify()
+
+    def close(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify()
+        self.synth_queue.put(None)
+
+    def _ensure_clip(self, text):
+        """Load a cached clip into memory, or ask for it to be synthesized; returns it if ready"""
+        clip = self.clips.get(text)
+        if clip is not None:
+            return clip
+        path = self.clip_path(text)
+        if os.path.exists(path) and simpleaudio is not None:
+            try:
+                clip = simpleaudio.WaveObject.from_wave_file(path)
+            except Exception:
+                return None
+            self.clips[text] = clip
+            return clip
+        if text not in self.synth_requested:
+            self.synth_requested.add(text)
+            self.synth_queue.put(text)
+        return None
+
+    def cooldown(self, item):
+        return self.good_repeat_after if item['status'] == 'good' else self.repeat_after
+
+    def _next_cue(self, feedback, now):
+        """
+        (text, wait): the message to speak next and the seconds until it may be spoken.
+        Only messages with a playable clip are considered; (None, None) if there are none.
+        """
+        best = None
+        for item in sorted(feedback or (), key=lambda item: CUE_PRIORITY.get(item['status'], 3)):
+            if self._ensure_clip(item['text']) is None:
+                self.suppressed += 1
+                continue
+            last = self.last_spoken.get(item['text'])
+            ready_at = now if last is None else last + self.cooldown(item)
+            if best is None or ready_at < best[1]:
+                best = (item['text'], ready_at)
+            if ready_at <= now:
+                # Most important message that is off cooldown
+                break
+        if best is None:
+            return None, None
+        text, ready_at = best
+        return text, max(ready_at, self.last_cue + self.min_gap) - now
+
+    def _audio_loop(self):
+        while self.running:
+            with self.condition:
+                feedback, rendered = self.feedback, self.rendered
+            # Evaluated outside the lock, loading a clip must not hold up submit()
+            now = time.monotonic()
+            text, wait = self._next_cue(feedback, now)
+            if text is None or wait > 0:
+                with self.condition:
+                    # Sleep until the gap or cooldown is over (forever if nothing is playable),
+                    # unless the feedback changed or a clip was rendered in the meantime
+                    if self.running and self.feedback is feedback and self.rendered == rendered:
+                        self.condition.wait(timeout=wait)
+                continue
+            playing = self.clips[text].play()
+            self.played += 1
+            while self.running and playing.is_playing():
+                time.sleep(0.05)
+            if playing.is_playing():
+                # Closed mid-cue
+                playing.stop()
+            # Gaps and cooldowns count from the end of the clip, so cues never overlap
+            ended = time.monotonic()
+            self.last_cue = ended
+            self.last_spoken[text] = ended
+
+    def _synth_loop(self):
+        if pyttsx3 is None:
+            return
+        engine = pyttsx3.init()
+        while True:
+            text = self.synth_queue.get()
+            if text is None:
+                break
+            path = self.clip_path(text)
+            tmp = path + '.tmp.wav'
+            try:
+                engine.save_to_file(text, tmp)
+                engine.runAndWait()
+                os.replace(tmp, path)
+                with self.condition:
+                    # The phrase may be part of the standing feedback
+                    self.rendered += 1
+                    self.condition.notify()
+            except Exception as e:
+                print(f"Could not synthesize cue '{text}': {e}")
@@ -0,0 +1,178 @@
+import json
+import os
+import time
+import warnings
+
+import numpy as np
+
+from pose_tracker import ANGLE_TRIPLETS, joint_angles
+
+# Body segments as (proximal, distal) keypoint pairs; a violated segment rejects its distal end
+SEGMENTS = [
+    (5, 6), (11, 12),            # shoulders, hips
+    (5, 11), (6, 12),            # torso sides
+    (5, 7), (6, 8),              # upper arms
+    (7, 9), (8, 10),             # forearms
+    (11, 13), (12, 14),          # thighs
+    (13, 15), (14, 16)           # shins
+]
+TORSO_SEGMENTS = [2, 3]
+# Shoulders, hips and torso sides: a rigid core whose longest projection gives the body scale
+CORE_SEGMENTS = [0, 1, 2, 3]
+MIN_SCORE = 0.3
+
+
+class CalibrationProfile:
+    """
+    A user's measured body proportions and neutral angles, with the arrays the
+    scoring path needs precomputed once: segment endpoints, maximum length
+    ratios and the aspect correction for normalized keypoints.
+
+    Proportions are only checked for segments that look too long: a limb
+    pointing at the camera projects shorter than it is, which is normal
+    movement, but no limb can project longer than its own length.
+    """
+    def __init__(self, user_id, segment_ratios, tolerances, neutral_angles, aspect, created_at=None):
+        self.user_id = user_id
+        self.segment_ratios = np.asarray(segment_ratios, dtype=float)
+        self.tolerances = np.asarray(tolerances, dtype=float)
+        self.neutral_angles = dict(neutral_angles)
+        self.aspect = aspect
+        self.created_at = created_at or time.time()
+
+        # Precomputed for filter() and normalize()
+        self.seg_a = np.array([a for a, _ in SEGMENTS])
+        self.seg_b = np.array([b for _, b in SEGMENTS])
+        self.upper = self.segment_ratios * (1 + self.tolerances)
+        self.core_ratios = self.segment_ratios[CORE_SEGMENTS]
+        # Keypoints are [y, x] normalized to the frame; x is stretched to square pixels
+        self.pixel_scale = np.array([1.0, aspect])
+
+    def segment_lengths(self, keypoints):
+        """Length of every segment in frame-height units, NaN where an endpoint is not visible"""
+        points = keypoints[:, :2] * self.pixel_scale
+        lengths = np.linalg.norm(points[self.seg_a] - points[self.seg_b], axis=1)
+        visible = (keypoints[self.seg_a, 2] > MIN_SCORE) & (keypoints[self.seg_b, 2] > MIN_SCORE)
+        return np.where(visible, lengths, np.nan)
+
+    def body_scale(self, lengths):
+        """
+        The user's torso length in this frame, from whichever core segment is least
+        foreshortened; NaN when none is visible
+        """
+        implied = lengths[CORE_SEGMENTS] / self.core_ratios
+        if np.all(np.isnan(implied)):
+            return np.nan
+        return np.nanmax(implied)
+
+    def filter(self, keypoints, min_valid=0.5):
+        """
+        Zero the confidence of keypoints at the end of segments too long for the user's proportions.
+        Returns (keypoints, plausible); plausible is False when too few measurable
+        segments fit, in which case the whole detection should be ignored.
+        """
+        lengths = self.segment_lengths(keypoints)
+        scale = self.body_scale(lengths)
+        if np.isnan(scale) or scale <= 0:
+            # No scale reference this frame, nothing to check against
+            return keypoints, True
+
+        ratios = lengths / scale
+        measured = ~np.isnan(ratios)
+        with np.errstate(invalid='ignore'):
+            violated = measured & (ratios > self.upper)
+        if not violated.any():
+            return keypoints, True
+
+        filtered = keypoints.copy()
+        filtered[self.seg_b[violated], 2] = 0.0
+        plausible = measured.sum() == 0 or (measured & ~violated).sum() / measured.sum() >= min_valid
+        return filtered, plausible
+
+    def normalize(self, keypoints):
+        """
+        (17, 2) [y, x] positions in square-pixel units, centred on the mid-hip and
+        scaled so the user's torso has unit length; unscaled if no core segment is visible
+        """
+        points = keypoints[:, :2] * self.pixel_scale
+        scale = self.body_scale(self.segment_lengths(keypoints))
+        centre = (points[11] + points[12]) / 2
+        return (points - centre) / (scale if scale > 0 else 1.0)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'created_at': self.created_at,
+            'segments': SEGMENTS,
+            'segment_ratios': self.segment_ratios.tolist(),
+            'tolerances': self.tolerances.tolist(),
+            'neutral_angles': self.neutral_angles,
+            'aspect': self.aspect
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Profile stored at `path`, or None if the user has not calibrated yet"""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['user_id'], data['segment_ratios'], data['tolerances'],
+                   data['neutral_angles'], data['aspect'], data['created_at'])
+
+
+class BodyCalibrator:
+    """Collects a short standing capture and measures the user's proportions from it"""
+    def __init__(self, user_id, aspect, frames=60, min_tolerance=0.25):
+        self.user_id = user_id
+        self.aspect = aspect
+        self.samples = np.empty((frames, 17, 3))
+        self.count = 0
+        self.min_tolerance = min_tolerance
+
+    @property
+    def done(self):
+        return self.count >= len(self.samples)
+
+    def add(self, keypoints):
+        """Add one detection; returns True once enough frames have been collected"""
+        if not self.done:
+            self.samples[self.count] = keypoints
+            self.count += 1
+        return self.done
+
+    def finish(self):
+        """Build the CalibrationProfile from the collected frames"""
+        samples = self.samples[:self.count]
+        scale = np.array([1.0, self.aspect])
+        a = np.array([a for a, _ in SEGMENTS])
+        b = np.array([b for _, b in SEGMENTS])
+
+        # (frames, segments) lengths, each frame normalized by its own torso length
+        points = samples[:, :, :2] * scale
+        lengths = np.linalg.norm(points[:, a] - points[:, b], axis=2)
+        visible = (samples[:, a, 2] > MIN_SCORE) & (samples[:, b, 2] > MIN_SCORE)
+        lengths = np.where(visible, lengths, np.nan)
+        with warnings.catch_warnings():
+            # Segments that were never visible during calibration are all-NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            torso = np.nanmean(lengths[:, TORSO_SEGMENTS], axis=1, keepdims=True)
+            ratios = lengths / torso
+            median = np.nanmedian(ratios, axis=0)
+            spread = np.nanstd(ratios, axis=0)
+
+        tolerances = np.maximum(self.min_tolerance, 3 * spread / np.maximum(median, 1e-6))
+        # Unmeasured segments accept anything
+        tolerances = np.where(np.isnan(median), 10.0, tolerances)
+        median = np.where(np.isnan(median), 1.0, median)
+
+        neutral = joint_angles(np.median(samples, axis=0)[None])[0]
+        return CalibrationProfile(
+            self.user_id, median, tolerances,
+            {name: float(angle) for name, angle in zip(ANGLE_TRIPLETS, neutral) if not np.isnan(angle)}, self.aspect
+        )
@@ -0,0 +1,117 @@
+import time
+import warnings
+
+import numpy as np
+
+# Typical (mean angle, range of motion) of each joint over a few reps, in PoseHistory angle order
+# (Hip, Knee, Elbow, Shoulder); used until centroids are fitted from recorded sessions
+DEFAULT_PROFILES = {
+    'Squats': [(130, 70), (130, 80), (150, 10), (60, 20)],
+    'Push-ups': [(175, 10), (175, 5), (130, 80), (60, 30)],
+    'Lunges': [(130, 50), (125, 70), (165, 10), (20, 15)]
+}
+# Window extremes are taken at these percentiles rather than min/max, which keypoint noise inflates
+FEATURE_QUANTILE = 0.95
+
+
+def window_features(angles):
+    """Per-window statistics of normalized angles: mean, std, low and high percentile of every column"""
+    with warnings.catch_warnings():
+        # Columns that were never visible in the window are all-NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        normalized = angles / 180.0
+        return np.concatenate([
+            np.nanmean(normalized, axis=0),
+            np.nanstd(normalized, axis=0),
+            np.nanpercentile(normalized, 100 * (1 - FEATURE_QUANTILE), axis=0),
+            np.nanpercentile(normalized, 100 * FEATURE_QUANTILE, axis=0)
+        ])
+
+
+def profile_centroid(profile):
+    """Feature vector of an idealized sinusoidal movement with the given mean and range per joint"""
+    means = np.array([m for m, _ in profile], dtype=float)
+    ranges = np.array([r for _, r in profile], dtype=float)
+    # Percentile q of a sinusoid over uniform phase is sin(pi * (q - 0.5)) of its amplitude
+    extreme = np.sin(np.pi * (FEATURE_QUANTILE - 0.5)) * ranges / 2
+    return np.concatenate([
+        means, ranges / (2 * np.sqrt(2)), means - extreme, means + extreme
+    ]) / 180.0
+
+
+class ExerciseClassifier:
+    """
+    Nearest-centroid exercise recognizer over sliding windows of pose history.
+    Every known exercise is scored in one batched distance computation, and the
+    active exercise only changes after the same answer has been confident for
+    several windows in a row. Windows far from every centroid, e.g. standing
+    still, are not classified at all.
+    """
+    def __init__(self, centroids=None, window=3.0, hop=0.5, temperature=0.001, min_confidence=0.6,
+                 max_distance=0.01, stable_windows=4):
+        centroids = centroids or {name: profile_centroid(p) for name, p in DEFAULT_PROFILES.items()}
+        self.labels = list(centroids)
+        self.centroids = np.stack([centroids[name] for name in self.labels])
+        self.window = window
+        self.hop = hop
+        self.temperature = temperature
+        self.min_confidence = min_confidence
+        self.max_distance = max_distance
+        self.stable_windows = stable_windows
+        self.reset()
+
+    def reset(self):
+        self.last_run = 0.0
+        self.candidate = None
+        self.streak = 0
+        self.last_label = None
+        self.last_confidence = 0.0
+
+    def classify(self, features):
+        """(label, confidence) for one window's features"""
+        valid = ~np.isnan(features)
+        if not valid.any():
+            return None, 0.0
+        # Mean squared distance to every centroid at once, ignoring features missing from this window
+        diff = (self.centroids[:, valid] - features[valid]) ** 2
+        distances = diff.mean(axis=1)
+        if distances.min() > self.max_distance:
+            return None, 0.0
+        scores = -distances / self.temperature
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(np.argmax(probabilities))
+        return self.labels[best], float(probabilities[best])
+
+    def update(self, history, now=None):
+        """
+        Classify the latest window of a PoseHistory at most once per `hop` seconds.
+        Returns the exercise to switch to once it is stable, otherwise None.
+        """
+        now = time.monotonic() if now is None else now
+        if now - self.last_run < self.hop or history.frames(self.window) < 2:
+            return None
+        self.last_run = now
+
+        _, _, angles = history.window(self.window)
+        label, confidence = self.classify(window_features(angles))
+        self.last_label, self.last_confidence = label, confidence
+        if label is None or confidence < self.min_confidence:
+            self.candidate, self.streak = None, 0
+            return None
+
+        if label == self.candidate:
+            self.streak += 1
+        else:
+            self.candidate, self.streak = label, 1
+        if self.streak == self.stable_windows:
+            return label
+        return None
+
+    @classmethod
+    def fit(cls, features, labels, **kwargs):
+        """Classifier with centroids learned from labelled window features"""
+        features = np.asarray(features, dtype=float)
+        labels = np.asarray(labels)
+        centroids = {name: np.nanmean(features[labels == name], axis=0) for name in np.unique(labels)}
+        return cls(centroids, **kwargs)
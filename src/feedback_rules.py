@@ -0,0 +1,269 @@
+import warnings
+
+import numpy as np
+
+# Keypoint indices in the MoveNet output
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 5, 6
+LEFT_HIP, RIGHT_HIP = 11, 12
+
+# Reference joint angles for each exercise offered in the UI
+REFERENCE_ANGLES = {
+    'Squats': {'Hip': 120, 'Knee': 145, 'Elbow': 90},
+    'Push-ups': {'Hip': 175, 'Knee': 175, 'Elbow': 90},
+    'Lunges': {'Hip': 110, 'Knee': 90, 'Elbow': 170}
+}
+
+# Per-frame features the rules can refer to
+FEATURE_NAMES = ['Hip', 'Knee', 'Elbow', 'Shoulder', 'Spine', 'ShoulderWidth', 'Visible']
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+# Ways a rule can look at a feature: this frame, or a statistic over the window
+STATS = ['current', 'mean', 'min', 'max', 'velocity']
+STAT_INDEX = {name: i for i, name in enumerate(STATS)}
+
+STATUS_PRIORITY = {'error': 0, 'warning': 1, 'good': 2}
+
+
+def pose_features(keypoints, angles, points=None):
+    """
+    Build the feature vector for one frame.
+    Features that can't be determined are NaN, so no rule fires on them.
+    `points` are optional (17, 2) [y, x] positions in square-pixel units, such as
+    CalibrationProfile.normalize(); body geometry uses them instead of the raw
+    frame-relative keypoints, which the frame's aspect ratio distorts.
+    """
+    points = keypoints[:, :2] if points is None else points
+    features = np.full(len(FEATURE_NAMES), np.nan)
+    for name, value in angles.items():
+        if name in FEATURE_INDEX:
+            features[FEATURE_INDEX[name]] = value
+
+    scores = keypoints[:, 2]
+    features[FEATURE_INDEX['Visible']] = np.count_nonzero(scores > 0.5)
+
+    if scores[LEFT_SHOULDER] > 0.5 and scores[RIGHT_SHOULDER] > 0.5:
+        features[FEATURE_INDEX['ShoulderWidth']] = abs(keypoints[LEFT_SHOULDER, 1] - keypoints[RIGHT_SHOULDER, 1])
+
+    # Spine straightness as in generateFeedback: 100 = perfectly vertical torso
+    torso = [NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP]
+    if np.all(scores[torso] > 0.5):
+        mid_shoulder = (points[LEFT_SHOULDER] + points[RIGHT_SHOULDER]) / 2
+        mid_hip = (points[LEFT_HIP] + points[RIGHT_HIP]) / 2
+        vertical_diff = abs(mid_shoulder[1] - mid_hip[1])
+        max_allowed = abs(mid_shoulder[0] - mid_hip[0]) * 0.3
+        if max_allowed > 0:
+            features[FEATURE_INDEX['Spine']] = min(100, max(0, 100 - vertical_diff / max_allowed * 100))
+
+    return features
+
+
+def joint_rules(reference_angles, tolerance=12, hysteresis=4):
+    """Rules that flag each joint straying from its reference angle in either direction"""
+    verbs = {'Hip': 'Move', 'Knee': 'Bend', 'Elbow': 'Bend', 'Shoulder': 'Adjust'}
+    rules = []
+    for joint, ideal in reference_angles.items():
+        verb = verbs.get(joint, 'Adjust')
+        rules.append({
+            'feature': joint, 'op': '>', 'value': ideal + tolerance, 'hysteresis': hysteresis,
+            'text': f"{verb} your {joint.lower()} more", 'status': 'warning',
+            'group': joint, 'ok_text': f"{joint} angle is correct"
+        })
+        rules.append({
+            'feature': joint, 'op': '<', 'value': ideal - tolerance, 'hysteresis': hysteresis,
+            'text': f"{verb} your {joint.lower()} less", 'status': 'warning',
+            'group': joint, 'ok_text': f"{joint} angle is correct"
+        })
+    return rules
+
+
+def exercise_rules(exercise):
+    """Full rule set for an exercise"""
+    rules = [
+        {
+            'feature': 'Visible', 'op': '<', 'value': 12, 'hysteresis': 1,
+            'text': 'Position yourself properly in front of the camera', 'status': 'error',
+            'exclusive': True
+        },
+        {
+            'feature': 'ShoulderWidth', 'op': '>', 'value': 0.35, 'hysteresis': 0.02,
+            'text': 'Move back from the camera to fit your entire body', 'status': 'warning'
+        },
+        {
+            'feature': 'ShoulderWidth', 'op': '<', 'value': 0.08, 'hysteresis': 0.02,
+            'text': 'Move closer to the camera for better detection', 'status': 'warning'
+        },
+        {
+            'feature': 'Spine', 'stat': 'mean', 'op': '<', 'value': 70, 'hysteresis': 5,
+            'text': 'Straighten your back for proper posture', 'status': 'error',
+            'group': 'Spine', 'ok_text': 'Back is straight, good job!'
+        },
+        {
+            'feature': 'Spine', 'stat': 'mean', 'op': '<', 'value': 85, 'hysteresis': 5,
+            'text': 'Try to keep your back straighter', 'status': 'warning',
+            'group': 'Spine', 'ok_text': 'Back is straight, good job!'
+        }
+    ]
+    rules.extend(joint_rules(REFERENCE_ANGLES.get(exercise, REFERENCE_ANGLES['Squats'])))
+
+    if exercise == 'Squats':
+        rules.append({
+            'feature': 'Knee', 'op': '<', 'value': 70, 'hysteresis': 5,
+            'when': ('Knee', 'velocity', '<', 0),
+            'text': "Don't drop too deep on the way down", 'status': 'warning'
+        })
+    return rules
+
+
+class FeedbackRuleEngine:
+    """
+    Evaluates declarative feedback rules as a handful of vectorized predicates.
+
+    A rule is a dict:
+        feature     name from FEATURE_NAMES
+        stat        'current' (default), 'mean', 'min', 'max' or 'velocity' over the window
+        op          '<' or '>'
+        value       threshold that switches the rule on
+        hysteresis  how far back past the threshold the value must go to switch off
+        when        optional (feature, stat, op, value) gating condition
+        text/status message shown while the rule is on
+        group       rules sharing a group show at most one message, most severe first
+        ok_text     message shown for the group while none of its rules are on and the
+                    values its rules look at can be measured
+        exclusive   while on, hide every other message
+    Rules, and whether a group is measurable, switch state only after `debounce`
+    consecutive frames agree.
+    """
+    def __init__(self, rules, window=15, debounce=3):
+        self.rules = rules
+        self.window = window
+        self.debounce = debounce
+        self.compile()
+        self.reset()
+
+    def compile(self):
+        """Turn the rule dicts into flat arrays used by evaluate()"""
+        rules = self.rules
+        self.feature_idx = np.array([FEATURE_INDEX[r['feature']] for r in rules], dtype=np.intp)
+        self.stat_idx = np.array([STAT_INDEX[r.get('stat', 'current')] for r in rules], dtype=np.intp)
+        self.less_than = np.array([r['op'] == '<' for r in rules], dtype=bool)
+        self.on_value = np.array([r['value'] for r in rules], dtype=float)
+        # Switch-off threshold sits on the far side of the switch-on threshold
+        hysteresis = np.array([r.get('hysteresis', 0) for r in rules], dtype=float)
+        self.off_value = np.where(self.less_than, self.on_value + hysteresis, self.on_value - hysteresis)
+
+        conditions = [r.get('when') for r in rules]
+        self.has_condition = np.array([c is not None for c in conditions], dtype=bool)
+        self.cond_feature_idx = np.array([FEATURE_INDEX[c[0]] if c else 0 for c in conditions], dtype=np.intp)
+        self.cond_stat_idx = np.array([STAT_INDEX[c[1]] if c else 0 for c in conditions], dtype=np.intp)
+        self.cond_less_than = np.array([c[2] == '<' if c else False for c in conditions], dtype=bool)
+        self.cond_value = np.array([c[3] if c else 0 for c in conditions], dtype=float)
+
+        self.exclusive = np.array([r.get('exclusive', False) for r in rules], dtype=bool)
+
+        # Rules shown in groups, ordered so the most severe active rule wins
+        self.groups = []
+        seen = {}
+        for i, rule in enumerate(rules):
+            group = rule.get('group', i)
+            if group not in seen:
+                seen[group] = len(self.groups)
+                self.groups.append({'rules': [], 'ok_text': rule.get('ok_text')})
+            self.groups[seen[group]]['rules'].append(i)
+        for group in self.groups:
+            group['rules'].sort(key=lambda i: STATUS_PRIORITY[rules[i]['status']])
+        self.group_idx = np.empty(len(rules), dtype=np.intp)
+        for g, group in enumerate(self.groups):
+            self.group_idx[group['rules']] = g
+
+    def reset(self):
+        """Forget the window and all rule state"""
+        self.history = np.full((self.window, len(FEATURE_NAMES)), np.nan)
+        self.filled = 0
+        self.head = 0
+        self.active = np.zeros(len(self.rules), dtype=bool)
+        self.pending = np.zeros(len(self.rules), dtype=np.int32)
+        self.measurable = np.zeros(len(self.groups), dtype=bool)
+        self.measurable_pending = np.zeros(len(self.groups), dtype=np.int32)
+        self.feedback = self.messages()
+
+    def set_rules(self, rules):
+        """Swap in a new rule set, e.g. after the exercise changes"""
+        self.rules = rules
+        self.compile()
+        self.reset()
+
+    def stat_table(self, features):
+        """(len(STATS), n_features) table of every statistic the rules can ask for"""
+        self.history[self.head] = features
+        self.head = (self.head + 1) % self.window
+        self.filled = min(self.filled + 1, self.window)
+
+        window = self.history if self.filled == self.window else self.history[:self.filled]
+        oldest = self.history[self.head] if self.filled == self.window else self.history[0]
+        span = max(self.filled - 1, 1)
+
+        with np.errstate(invalid='ignore'):
+            return np.stack([
+                features,
+                np.nanmean(window, axis=0),
+                np.nanmin(window, axis=0),
+                np.nanmax(window, axis=0),
+                (features - oldest) / span
+            ])
+
+    def evaluate(self, features):
+        """
+        Feed one frame of features.
+        Returns (feedback, changed); feedback is the same list object until the messages change.
+        """
+        with warnings.catch_warnings():
+            # All-NaN columns are expected while keypoints are not visible
+            warnings.simplefilter('ignore', RuntimeWarning)
+            table = self.stat_table(features)
+
+        values = table[self.stat_idx, self.feature_idx]
+        threshold = np.where(self.active, self.off_value, self.on_value)
+        with np.errstate(invalid='ignore'):
+            raw = np.where(self.less_than, values < threshold, values > threshold)
+            cond_values = table[self.cond_stat_idx, self.cond_feature_idx]
+            cond = np.where(self.cond_less_than, cond_values < self.cond_value, cond_values > self.cond_value)
+        raw &= ~self.has_condition | cond
+
+        # A group is measurable while any of its rules has a value to look at
+        measurable = np.bincount(self.group_idx, weights=~np.isnan(values), minlength=len(self.groups)) > 0
+
+        # Debounce: a rule flips only after `debounce` frames in a row disagree with it
+        disagree = raw != self.active
+        self.pending = np.where(disagree, self.pending + 1, 0)
+        flip = self.pending >= self.debounce
+        self.measurable_pending = np.where(measurable != self.measurable, self.measurable_pending + 1, 0)
+        measurable_flip = self.measurable_pending >= self.debounce
+        if not flip.any() and not measurable_flip.any():
+            return self.feedback, False
+
+        self.active ^= flip
+        self.pending[flip] = 0
+        self.measurable ^= measurable_flip
+        self.measurable_pending[measurable_flip] = 0
+        self.feedback = self.messages()
+        return self.feedback, True
+
+    def messages(self):
+        """Feedback items for the current rule state"""
+        exclusive = np.flatnonzero(self.active & self.exclusive)
+        if exclusive.size:
+            rule = self.rules[exclusive[0]]
+            return [{'text': rule['text'], 'status': rule['status']}]
+
+        feedback = []
+        for g, group in enumerate(self.groups):
+            for i in group['rules']:
+                if self.active[i]:
+                    feedback.append({'text': self.rules[i]['text'], 'status': self.rules[i]['status']})
+                    break
+            else:
+                # No praise for what can't be seen
+                if group['ok_text'] and self.measurable[g]:
+                    feedback.append({'text': group['ok_text'], 'status': 'good'})
+        return feedback
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Fixed set of preallocated frame buffers shared along the capture pipeline.
+    Buffers are handed out with acquire() and must come back through release();
+    when none are free, acquire() returns None so the caller can fall back to a
+    plain allocation. Usage is tracked so leaks and exhaustion show up in stats().
+    """
+    def __init__(self, shape, count, dtype=np.uint8, leak_after=5.0):
+        self.shape = tuple(shape)
+        self.count = count
+        self.leak_after = leak_after
+        self.buffers = [np.empty(self.shape, dtype=dtype) for _ in range(count)]
+        self.index = {id(buf): i for i, buf in enumerate(self.buffers)}
+        self.free = deque(range(count))
+        self.acquired_at = [None] * count
+        self.lock = threading.Lock()
+
+        self.acquired = 0
+        self.exhausted = 0
+        self.high_water = 0
+
+    @classmethod
+    def for_capture(cls, cap, count=8):
+        """Pool sized from the capture profile of an opened cv2.VideoCapture"""
+        import cv2
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        return cls((height, width, 3), count)
+
+    def acquire(self):
+        """Take a free buffer, or None if the pool is exhausted"""
+        with self.lock:
+            if not self.free:
+                self.exhausted += 1
+                return None
+            i = self.free.popleft()
+            self.acquired_at[i] = time.monotonic()
+            self.acquired += 1
+            self.high_water = max(self.high_water, self.count - len(self.free))
+            return self.buffers[i]
+
+    def release(self, buf):
+        """Return a buffer to the pool; arrays that are not from this pool are ignored"""
+        i = self.index.get(id(buf))
+        if i is None or self.buffers[i] is not buf:
+            return False
+        with self.lock:
+            if self.acquired_at[i] is None:
+                return False
+            self.acquired_at[i] = None
+            self.free.append(i)
+        return True
+
+    def owns(self, buf):
+        """Whether an array is one of this pool's buffers"""
+        i = self.index.get(id(buf))
+        return i is not None and self.buffers[i] is buf
+
+    def stats(self):
+        """Snapshot of pool usage"""
+        now = time.monotonic()
+        with self.lock:
+            held = [now - t for t in self.acquired_at if t is not None]
+            return {
+                'size': self.count,
+                'in_use': len(held),
+                'high_water': self.high_water,
+                'acquired': self.acquired,
+                'exhausted': self.exhausted,
+                # Buffers held far longer than a frame's lifetime were most likely never released
+                'leaked': sum(1 for age in held if age > self.leak_after),
+                'oldest_held': max(held, default=0.0)
+            }
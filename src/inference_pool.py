@@ -0,0 +1,234 @@
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from movenet_model import MoveNetModel
+
+NUM_KEYPOINTS = 17
+
+
+class SharedFrameRing:
+    """Fixed set of frame slots and keypoint results living in shared memory"""
+    def __init__(self, slots, frame_shape, name=None, create=True):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        frame_bytes = int(np.prod(self.frame_shape))
+        itemsize = np.dtype(np.float32).itemsize
+        result_bytes = slots * NUM_KEYPOINTS * 3 * itemsize
+        # Results start at the next float32 boundary after the frames, odd frame sizes would misalign them
+        results_offset = -(-slots * frame_bytes // itemsize) * itemsize
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=results_offset + result_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = create
+
+        # Frames first, then one (17, 3) keypoint block per slot
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.results = np.ndarray(
+            (slots, NUM_KEYPOINTS, 3), dtype=np.float32,
+            buffer=self.shm.buf, offset=results_offset
+        )
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        """Detach from the shared block, unlinking it if this side created it"""
+        # Drop the views before closing, otherwise the buffer is still exported
+        self.frames = None
+        self.results = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _inference_worker(ring_name, slots, frame_shape, tasks, results):
+    """Worker process: run MoveNet in place on frames written into the ring"""
+    ring = SharedFrameRing(slots, frame_shape, name=ring_name, create=False)
+    model = MoveNetModel()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, seq = task
+            keypoints = model.detect_pose(ring.frames[slot])
+            ring.results[slot] = keypoints
+            # Only the slot index travels back, the keypoints stay in shared memory
+            results.put((slot, seq))
+    finally:
+        ring.close()
+
+
+class InferencePool:
+    """
+    Multi-process pose inference engine.
+    Producers copy frames into a shared-memory ring, N worker processes each
+    hold their own MoveNetModel and write keypoints back into the ring.
+    submit() and release() may be called from several producer threads.
+    """
+    def __init__(self, frame_shape, workers=None, slots=None):
+        self.workers = workers or max(1, mp.cpu_count() - 1)
+        self.slots = slots or self.workers * 2
+        self.frame_shape = tuple(frame_shape)
+
+        ctx = mp.get_context("spawn")
+        self.ring = SharedFrameRing(self.slots, self.frame_shape)
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.free_slots = queue.Queue()
+        for slot in range(self.slots):
+            self.free_slots.put(slot)
+
+        self.seq = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.processes = [
+            ctx.Process(
+                target=_inference_worker,
+                args=(self.ring.name, self.slots, self.frame_shape, self.tasks, self.results),
+                daemon=True
+            )
+            for _ in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+    def submit(self, frame):
+        """
+        Queue a frame for inference.
+        Returns its sequence number, or None if every slot is busy and the frame was dropped.
+        """
+        with self.lock:
+            try:
+                slot = self.free_slots.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return None
+            self.seq += 1
+            seq = self.seq
+
+        # The slot belongs to this producer until its result is released
+        np.copyto(self.ring.frames[slot], frame)
+        self.tasks.put((slot, seq))
+        return seq
+
+    def get_result(self, timeout=None):
+        """
+        Wait for the next finished frame.
+        Returns (seq, slot, keypoints) or None on timeout. The frame stays
+        available as pool.frame(slot) until release(slot) is called.
+        """
+        try:
+            slot, seq = self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return seq, slot, self.ring.results[slot].copy()
+
+    def frame(self, slot):
+        """View of the frame held in a slot (no copy)"""
+        return self.ring.frames[slot]
+
+    def release(self, slot):
+        """Hand a slot back to producers once its frame is no longer needed"""
+        self.free_slots.put(slot)
+
+    def close(self):
+        """Stop all workers and free the shared memory"""
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.tasks.close()
+        self.results.close()
+        self.ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def analyze_video(video_path, output_path, workers=None, progress=None):
+    """
+    Run pose detection over a whole recorded video with an InferencePool and
+    save the keypoints in the poses.npz layout used by recorded sessions.
+    Frames are never dropped: when every slot is busy the oldest result is
+    collected before the next frame is submitted.
+    """
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    ret, frame = cap.read()
+    if not ret:
+        cap.release()
+        raise ValueError(f"Could not read {video_path}")
+
+    keypoints = {}
+    with InferencePool(frame.shape, workers=workers) as pool:
+        def collect():
+            finished = pool.get_result(timeout=1.0)
+            while finished is None:
+                if not any(process.is_alive() for process in pool.processes):
+                    raise RuntimeError("All inference workers exited")
+                finished = pool.get_result(timeout=1.0)
+            seq, slot, result = finished
+            pool.release(slot)
+            keypoints[seq - 1] = result
+            if progress is not None:
+                progress(len(keypoints), total)
+
+        in_flight = 0
+        while ret:
+            if in_flight == pool.slots:
+                collect()
+                in_flight -= 1
+            pool.submit(frame)
+            in_flight += 1
+            ret, frame = cap.read()
+        cap.release()
+        for _ in range(in_flight):
+            collect()
+
+    count = len(keypoints)
+    np.savez(
+        output_path,
+        timestamps=np.arange(count, dtype=np.float64) / fps,
+        keypoints=np.stack([keypoints[i] for i in range(count)]).astype(np.float32)
+    )
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect poses in a recorded video using all CPU cores")
+    parser.add_argument("video", help="video file to analyze")
+    parser.add_argument("output", nargs="?", default=None, help="poses .npz to write (default: next to the video)")
+    parser.add_argument("--workers", type=int, default=None, help="inference processes (default: one per spare core)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.video)[0] + '_poses.npz'
+    started = time.monotonic()
+    count = analyze_video(
+        args.video, output, workers=args.workers,
+        progress=lambda done, total: print(f"\r{done}/{total or '?'} frames", end="", file=sys.stderr)
+    )
+    elapsed = time.monotonic() - started
+    print(f"\n{count} frames in {elapsed:.1f} s ({count / max(elapsed, 1e-6):.1f} fps) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import time
+
+
+class MediaClock:
+    """
+    Shared playback timeline for the trainer video and the trainee stream.
+    Media time advances with the wall clock scaled by the playback rate and
+    stands still while paused. The state is swapped as one tuple, so the
+    capture thread can read the clock while the GUI thread drives it.
+    """
+    def __init__(self):
+        # (wall time at anchor, media time at anchor, rate, running)
+        self._state = (time.perf_counter(), 0.0, 1.0, False)
+
+    def now(self):
+        """Current media time in seconds"""
+        wall, media, rate, running = self._state
+        if running:
+            return media + (time.perf_counter() - wall) * rate
+        return media
+
+    @property
+    def rate(self):
+        return self._state[2]
+
+    @property
+    def running(self):
+        return self._state[3]
+
+    def _reanchor(self, media=None, rate=None, running=None):
+        _, _, old_rate, old_running = self._state
+        self._state = (
+            time.perf_counter(),
+            self.now() if media is None else media,
+            old_rate if rate is None else rate,
+            old_running if running is None else running
+        )
+
+    def start(self):
+        """Resume advancing media time"""
+        self._reanchor(running=True)
+
+    def pause(self):
+        """Freeze media time at its current value"""
+        self._reanchor(running=False)
+
+    def seek(self, seconds):
+        """Jump to a media time, keeping the running state"""
+        self._reanchor(media=max(0.0, seconds))
+
+    def set_rate(self, rate):
+        """Change the playback rate (e.g. 0.5 for slow motion) without a jump"""
+        self._reanchor(rate=rate)
+
+    def frame_at(self, seconds, fps):
+        """Index of the frame shown at a media time for a video of the given fps"""
+        return int(seconds * fps)
@@ -0,0 +1,89 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap pre-inference check that decides whether a frame needs pose detection.
+    Frames are shrunk to a small grey thumbnail and compared with the previous
+    one; while the scene is static the last keypoints are reused, and while
+    nobody is in view inference drops to a slow idle rate.
+    """
+    def __init__(self, threshold=3.0, size=(64, 48), max_reuse=0.5, idle_interval=1.0, min_visible=5):
+        # Mean absolute grey-level change (0-255) that counts as motion
+        self.threshold = threshold
+        self.size = size
+        # Longest time keypoints are reused while someone is in view
+        self.max_reuse = max_reuse
+        # Inference interval while nobody is in view and nothing moves
+        self.idle_interval = idle_interval
+        self.min_visible = min_visible
+
+        self.small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self.grey = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.previous = np.empty_like(self.grey)
+        self.diff = np.empty_like(self.grey)
+
+        self.frames = 0
+        self.inferred = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame and result, e.g. after a source switch"""
+        self.has_previous = False
+        self.present = False
+        self.has_result = False
+        self.last_inference = 0.0
+        self.motion = 0.0
+
+    def should_infer(self, frame, now=None):
+        """Whether pose detection has to run on this frame"""
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+
+        if frame.shape[:2] != (self.size[1], self.size[0]):
+            cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.grey)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.grey)
+
+        if self.has_previous:
+            cv2.absdiff(self.grey, self.previous, dst=self.diff)
+            self.motion = float(cv2.mean(self.diff)[0])
+        else:
+            self.motion = float('inf')
+        self.previous, self.grey = self.grey, self.previous
+        self.has_previous = True
+
+        since = now - self.last_inference
+        if not self.has_result or self.motion >= self.threshold:
+            infer = True
+        elif self.present:
+            infer = since >= self.max_reuse
+        else:
+            infer = since >= self.idle_interval
+
+        if infer:
+            self.inferred += 1
+            self.last_inference = now
+        return infer
+
+    def observe(self, keypoints):
+        """Record the result of an inference so the gate knows whether anyone is in view"""
+        self.has_result = True
+        self.present = keypoints is not None and np.count_nonzero(keypoints[..., 2] > 0.3) >= self.min_visible
+
+    @property
+    def skip_rate(self):
+        return 1 - self.inferred / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'inferred': self.inferred,
+            'skip_rate': round(self.skip_rate, 3),
+            'motion': round(self.motion, 2) if self.motion != float('inf') else None,
+            'present': bool(self.present)
+        }
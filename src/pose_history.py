@@ -0,0 +1,169 @@
+import numpy as np
+
+ANGLE_NAMES = ('Hip', 'Knee', 'Elbow', 'Shoulder')
+
+# Angle that drives rep counting for each exercise, with its (low, high) hysteresis thresholds
+REP_ANGLES = {
+    'Squats': ('Knee', 100, 160),
+    'Push-ups': ('Elbow', 100, 150),
+    'Lunges': ('Knee', 110, 160)
+}
+
+
+class PoseHistory:
+    """
+    Fixed-capacity ring of recent poses: keypoints (capacity, 17, 3), one column
+    per joint angle and a timestamp per frame.
+
+    Every row is written twice, at i and i + capacity, so the latest n frames
+    are always one contiguous slice and window queries work on views instead
+    of copies. Appending is O(1).
+    """
+    def __init__(self, capacity=900, angle_names=ANGLE_NAMES):
+        self.capacity = capacity
+        self.angle_names = list(angle_names)
+        self.angle_index = {name: i for i, name in enumerate(self.angle_names)}
+        self._keypoints = np.zeros((2 * capacity, 17, 3), dtype=np.float32)
+        self._angles = np.full((2 * capacity, len(self.angle_names)), np.nan, dtype=np.float32)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.last = -1
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Drop all stored frames"""
+        self.last = -1
+        self.count = 0
+
+    def append(self, timestamp, keypoints, angles):
+        """Store one frame; `angles` is the dict emitted with pose_update"""
+        i = (self.last + 1) % self.capacity
+        for j in (i, i + self.capacity):
+            self._keypoints[j] = keypoints
+            self._timestamps[j] = timestamp
+            for name, column in self.angle_index.items():
+                self._angles[j, column] = angles.get(name, np.nan)
+        self.last = i
+        self.count = min(self.count + 1, self.capacity)
+
+    def _slice(self, n):
+        end = self.last + self.capacity + 1
+        return slice(end - n, end)
+
+    def frames(self, seconds=None):
+        """Number of stored frames in the last `seconds` (all frames if None)"""
+        if seconds is None or self.count == 0:
+            return self.count
+        timestamps = self._timestamps[self._slice(self.count)]
+        start = np.searchsorted(timestamps, timestamps[-1] - seconds, side='left')
+        return self.count - start
+
+    def window(self, seconds=None):
+        """(timestamps, keypoints, angles) views covering the last `seconds`"""
+        s = self._slice(self.frames(seconds))
+        return self._timestamps[s], self._keypoints[s], self._angles[s]
+
+    def angle(self, name, seconds=None):
+        """View of one angle column over the window"""
+        s = self._slice(self.frames(seconds))
+        return self._angles[s, self.angle_index[name]]
+
+    def timestamps(self, seconds=None):
+        return self._timestamps[self._slice(self.frames(seconds))]
+
+    def angle_range(self, name, seconds=None):
+        """(min, max) of an angle over the window"""
+        values = self.angle(name, seconds)
+        if not np.any(~np.isnan(values)):
+            return np.nan, np.nan
+        return float(np.nanmin(values)), float(np.nanmax(values))
+
+    def range_of_motion(self, name, seconds=None):
+        """Spread between the smallest and largest angle over the window"""
+        low, high = self.angle_range(name, seconds)
+        return high - low
+
+    def angle_velocity(self, name, seconds=None):
+        """Angular velocity in degrees per second between consecutive frames"""
+        values = self.angle(name, seconds)
+        timestamps = self.timestamps(seconds)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.diff(values) / np.diff(timestamps)
+
+    def joint_velocity(self, keypoint, seconds=None):
+        """Speed of one keypoint in normalized image units per second between consecutive frames"""
+        timestamps, keypoints, _ = self.window(seconds)
+        step = np.diff(keypoints[:, keypoint, :2], axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.hypot(step[:, 0], step[:, 1]) / np.diff(timestamps)
+
+    def time_under_tension(self, name, threshold, seconds=None, below=True):
+        """Seconds spent with an angle below (or above) a threshold over the window"""
+        values = self.angle(name, seconds)
+        timestamps = self.timestamps(seconds)
+        loaded = values[:-1] < threshold if below else values[:-1] > threshold
+        return float(np.sum(np.diff(timestamps)[loaded]))
+
+    def reps(self, name, low, high, seconds=None):
+        """
+        Segment completed reps of an angle going below `low` and back above `high`.
+        Returns an (R, 5) array of start time, end time, min angle, max angle and range of motion.
+        """
+        values = self.angle(name, seconds)
+        timestamps = self.timestamps(seconds)
+        if values.size < 2:
+            return np.empty((0, 5))
+
+        # Hysteresis without a Python loop: 1 = down, 0 = up, -1 = hold the previous state
+        code = np.where(values < low, 1, np.where(values > high, 0, -1))
+        decided = np.where(code >= 0, np.arange(code.size), 0)
+        np.maximum.accumulate(decided, out=decided)
+        state = np.where(code[decided] >= 0, code[decided], 0)
+
+        # A rep ends on each return from down to up
+        ends = np.flatnonzero(np.diff(state) == -1) + 1
+        if ends.size == 0:
+            return np.empty((0, 5))
+        starts = np.concatenate(([0], ends[:-1]))
+        if state[0] == 1:
+            # The window opened mid-rep, its first segment is incomplete
+            starts, ends = starts[1:], ends[1:]
+            if ends.size == 0:
+                return np.empty((0, 5))
+
+        segment = values[starts[0]:ends[-1]]
+        offsets = starts - starts[0]
+        mins = np.fmin.reduceat(segment, offsets)
+        maxs = np.fmax.reduceat(segment, offsets)
+        return np.column_stack((timestamps[starts], timestamps[ends - 1], mins, maxs, maxs - mins))
+
+    def tempo(self, name, low, high, seconds=None):
+        """Mean rep duration in seconds over the window"""
+        reps = self.reps(name, low, high, seconds)
+        if len(reps) == 0:
+            return np.nan
+        return float(np.mean(reps[:, 1] - reps[:, 0]))
+
+
+class RepCounter:
+    """Incremental rep counter for one angle using the same hysteresis as PoseHistory.reps()"""
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+        self.down = False
+        self.count = 0
+
+    def update(self, angle):
+        """Feed one angle; returns True when a rep has just been completed"""
+        if np.isnan(angle):
+            # Joint not visible this frame, hold the current state
+            return False
+        if not self.down and angle < self.low:
+            self.down = True
+        elif self.down and angle > self.high:
+            self.down = False
+            self.count += 1
+            return True
+        return False
@@ -0,0 +1,139 @@
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from pose_history import ANGLE_NAMES
+
+MAGIC = 0x504F5345  # "POSE"
+VERSION = 1
+DEFAULT_NAME = 'workout_trainer_poses'
+
+STATUS_CODES = {'CORRECT': 0, 'ADJUST': 1, 'INCORRECT': 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'), ('version', '<u4'), ('slots', '<u4'), ('record_size', '<u4'),
+    ('angle_count', '<u4'), ('pad', '<u4'), ('write_index', '<u8'), ('reserved', '<u8', 4)
+])
+
+# One fixed-size little-endian record per frame; `seq` is a seqlock (odd while being written)
+RECORD_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('frame', '<u8'),
+    ('timestamp', '<f8'),
+    ('accuracy', '<f4'),
+    ('status', 'u1'),
+    ('pad', 'u1', 3),
+    ('keypoints', '<f4', (17, 3)),
+    ('angles', '<f4', (len(ANGLE_NAMES),))
+])
+
+
+def _views(buf, slots):
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buf)
+    records = np.ndarray((slots,), dtype=RECORD_DTYPE, buffer=buf, offset=HEADER_DTYPE.itemsize)
+    return header, records
+
+
+class PosePublisher:
+    """
+    Publishes each frame's keypoints, angles and accuracy to a shared-memory
+    ring that other local processes can read. There is a single writer and no
+    locks: readers detect torn or overwritten records through the per-record
+    sequence number, so they can attach, lag or detach without ever slowing
+    the capture loop.
+    """
+    def __init__(self, name=DEFAULT_NAME, slots=256):
+        size = HEADER_DTYPE.itemsize + slots * RECORD_DTYPE.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous run that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.slots = slots
+        self.header, self.records = _views(self.shm.buf, slots)
+        self.records[:] = np.zeros((), dtype=RECORD_DTYPE)
+        self.header['magic'] = MAGIC
+        self.header['version'] = VERSION
+        self.header['slots'] = slots
+        self.header['record_size'] = RECORD_DTYPE.itemsize
+        self.header['angle_count'] = len(ANGLE_NAMES)
+        self.header['write_index'] = 0
+        self.count = 0
+
+    def publish(self, timestamp, keypoints, angles, accuracy, status):
+        """Write one frame; never blocks"""
+        n = self.count
+        record = self.records[n % self.slots]
+        record['seq'] = 2 * n + 1
+        record['frame'] = n
+        record['timestamp'] = timestamp
+        record['accuracy'] = accuracy
+        record['status'] = STATUS_CODES.get(status, 255)
+        record['keypoints'] = keypoints
+        record['angles'] = [angles.get(name, np.nan) for name in ANGLE_NAMES]
+        record['seq'] = 2 * n + 2
+        self.count = n + 1
+        self.header['write_index'] = self.count
+
+    def close(self):
+        self.header = None
+        self.records = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class PoseSubscriber:
+    """Reader side of PosePublisher, for overlays, loggers and scoreboards"""
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Attaching must not make this process unlink the segment when it exits
+        resource_tracker.unregister(self.shm._name, 'shared_memory')
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        if header['magic'] != MAGIC or header['version'] != VERSION:
+            raise ValueError(f"{name} is not a pose stream")
+        self.slots = int(header['slots'])
+        self.header, self.records = _views(self.shm.buf, self.slots)
+        # Start from the newest frame
+        self.next_index = int(self.header['write_index'])
+        self.missed = 0
+
+    def read(self):
+        """
+        Return the frames published since the last call, oldest first.
+        Frames overwritten before they could be read are counted in `missed`.
+        """
+        write_index = int(self.header['write_index'])
+        first = max(self.next_index, write_index - self.slots)
+        self.missed += first - self.next_index
+        frames = []
+        for n in range(first, write_index):
+            record = self.records[n % self.slots]
+            seq = int(record['seq'])
+            if seq != 2 * n + 2:
+                self.missed += 1
+                continue
+            data = record.copy()
+            if int(record['seq']) != seq:
+                # Overwritten while copying
+                self.missed += 1
+                continue
+            frames.append({
+                'frame': int(data['frame']),
+                'timestamp': float(data['timestamp']),
+                'keypoints': data['keypoints'],
+                'angles': dict(zip(ANGLE_NAMES, data['angles'].tolist())),
+                'accuracy': float(data['accuracy']),
+                'status': STATUS_NAMES.get(int(data['status']), 'UNKNOWN')
+            })
+        self.next_index = write_index
+        return frames
+
+    def close(self):
+        self.header = None
+        self.records = None
+        self.shm.close()
@@ -0,0 +1,215 @@
+import numpy as np
+
+from pose_history import RepCounter, REP_ANGLES
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional, fall back to greedy matching
+    linear_sum_assignment = None
+
+# (first, vertex, last) keypoints of each joint angle, left side then right side
+ANGLE_TRIPLETS = {
+    'Hip': ((5, 11, 13), (6, 12, 14)),
+    'Knee': ((11, 13, 15), (12, 14, 16)),
+    'Elbow': ((5, 7, 9), (6, 8, 10)),
+    'Shoulder': ((11, 5, 7), (12, 6, 8))
+}
+
+# Per-keypoint falloff used by COCO object keypoint similarity
+OKS_SIGMAS = np.array([
+    .26, .25, .25, .35, .35, .79, .79, .72, .72, .62, .62, 1.07, 1.07, .87, .87, .89, .89
+]) / 10.0
+
+
+def keypoint_boxes(keypoints, min_score=0.3):
+    """(P, 4) boxes [y0, x0, y1, x1] around the confident keypoints of each person"""
+    valid = keypoints[..., 2] > min_score
+    ys, xs = keypoints[..., 0], keypoints[..., 1]
+    boxes = np.stack([
+        np.where(valid, ys, np.inf).min(axis=1),
+        np.where(valid, xs, np.inf).min(axis=1),
+        np.where(valid, ys, -np.inf).max(axis=1),
+        np.where(valid, xs, -np.inf).max(axis=1)
+    ], axis=1)
+    # People without confident keypoints get an empty box
+    boxes[~valid.any(axis=1)] = 0
+    return boxes
+
+
+def box_iou(a, b):
+    """(P, T) IoU between two sets of boxes"""
+    y0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    x0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    y1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    x1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(y1 - y0, 0, None) * np.clip(x1 - x0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def keypoint_similarity(a, b, boxes_b, min_score=0.3):
+    """(P, T) object keypoint similarity between detections `a` and tracks `b`"""
+    d2 = np.sum((a[:, None, :, :2] - b[None, :, :, :2]) ** 2, axis=-1)
+    area = ((boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1]))[None, :, None]
+    similarity = np.exp(-d2 / (2 * np.maximum(area, 1e-6) * OKS_SIGMAS ** 2 * 4))
+    visible = (a[:, None, :, 2] > min_score) & (b[None, :, :, 2] > min_score)
+    count = visible.sum(axis=-1)
+    return np.where(count > 0, (similarity * visible).sum(axis=-1) / np.maximum(count, 1), 0.0)
+
+
+def assign(cost, max_cost):
+    """Minimum-cost matching; returns (detection indices, track indices) of accepted pairs"""
+    if cost.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(cost)
+    else:
+        # Greedy: take the cheapest remaining pair until one side runs out
+        order = np.argsort(cost, axis=None)
+        used_rows, used_cols, rows, cols = set(), set(), [], []
+        for flat in order:
+            r, c = divmod(int(flat), cost.shape[1])
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            rows.append(r)
+            cols.append(c)
+            if len(rows) == min(cost.shape):
+                break
+        rows, cols = np.array(rows, dtype=int), np.array(cols, dtype=int)
+    keep = cost[rows, cols] <= max_cost
+    return rows[keep], cols[keep]
+
+
+def joint_angles(keypoints, min_score=0.3):
+    """(P, 4) joint angles in ANGLE_TRIPLETS order, left side when visible, else right, else NaN"""
+    angles = np.full((keypoints.shape[0], len(ANGLE_TRIPLETS)), np.nan)
+    for j, sides in enumerate(ANGLE_TRIPLETS.values()):
+        for side in reversed(sides):
+            a, b, c = (keypoints[:, i] for i in side)
+            radians = (np.arctan2(c[:, 0] - b[:, 0], c[:, 1] - b[:, 1])
+                       - np.arctan2(a[:, 0] - b[:, 0], a[:, 1] - b[:, 1]))
+            angle = np.abs(np.degrees(radians))
+            angle = np.where(angle > 180, 360 - angle, angle)
+            visible = (a[:, 2] > min_score) & (b[:, 2] > min_score) & (c[:, 2] > min_score)
+            # The left side is applied last so it wins when both are visible
+            angles[:, j] = np.where(visible, angle, angles[:, j])
+    return np.round(angles)
+
+
+class TrackedPerson:
+    """One person followed across frames with their own scoring state"""
+    def __init__(self, track_id, keypoints, exercise):
+        self.id = track_id
+        self.keypoints = keypoints
+        self.misses = 0
+        self.hits = 1
+        self.angles = {}
+        self.accuracy = {}
+        self.set_exercise(exercise)
+
+    def set_exercise(self, exercise):
+        self.rep_angle, low, high = REP_ANGLES[exercise]
+        self.rep_counter = RepCounter(low, high)
+
+    @property
+    def reps(self):
+        return self.rep_counter.count
+
+    def summary(self):
+        return {'id': self.id, 'angles': self.angles, 'accuracy': self.accuracy, 'reps': self.reps}
+
+
+class PoseTracker:
+    """
+    Assigns stable IDs to the (P, 17, 3) detections of each frame.
+    Matching cost combines box IoU and keypoint similarity, computed for all
+    detection/track pairs at once, and is solved with Hungarian assignment
+    (scipy) or a greedy fallback.
+    """
+    def __init__(self, exercise='Squats', reference_angles=None, iou_weight=0.5, max_cost=0.8,
+                 max_misses=15, min_visible=6):
+        self.exercise = exercise
+        self.reference_angles = reference_angles or {}
+        self.iou_weight = iou_weight
+        self.max_cost = max_cost
+        self.max_misses = max_misses
+        self.min_visible = min_visible
+        self.tracks = []
+        self.next_id = 1
+
+    def set_exercise(self, exercise, reference_angles):
+        self.exercise = exercise
+        self.reference_angles = reference_angles
+        for track in self.tracks:
+            track.set_exercise(exercise)
+
+    def update(self, detections):
+        """Match a frame's detections to tracks and score every visible person; returns them"""
+        visible = self.match(detections)
+        if visible:
+            self.score(visible)
+        return visible
+
+    def match(self, detections):
+        """
+        Match a frame's detections to tracks without scoring them; returns the visible people.
+        Call score() once on them afterwards, e.g. after adjusting their keypoints.
+        """
+        detections = detections[(detections[..., 2] > 0.3).sum(axis=1) >= self.min_visible]
+        det_boxes = keypoint_boxes(detections)
+
+        matched_tracks = set()
+        unmatched = np.ones(len(detections), dtype=bool)
+        if self.tracks and len(detections):
+            track_kps = np.stack([t.keypoints for t in self.tracks])
+            track_boxes = keypoint_boxes(track_kps)
+            cost = 1 - (self.iou_weight * box_iou(det_boxes, track_boxes)
+                        + (1 - self.iou_weight) * keypoint_similarity(detections, track_kps, track_boxes))
+            rows, cols = assign(cost, self.max_cost)
+            for r, c in zip(rows, cols):
+                track = self.tracks[c]
+                track.keypoints = detections[r]
+                track.misses = 0
+                track.hits += 1
+                matched_tracks.add(c)
+            unmatched[rows] = False
+
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for r in np.flatnonzero(unmatched):
+            self.tracks.append(TrackedPerson(self.next_id, detections[r], self.exercise))
+            self.next_id += 1
+
+        return [t for t in self.tracks if t.misses == 0]
+
+    def score(self, people):
+        """
+        Angles, accuracy and rep counting for all visible people in one batch.
+        Joints that can't be seen have no angle or accuracy and are left out of Overall.
+        """
+        names = list(ANGLE_TRIPLETS)
+        angles = joint_angles(np.stack([p.keypoints for p in people]))
+        ref_names = [n for n in names if n in self.reference_angles]
+        ref_cols = [names.index(n) for n in ref_names]
+        if ref_cols:
+            ideal = np.array([self.reference_angles[n] for n in ref_names])
+            accuracy = np.clip(np.round(100 - np.abs(angles[:, ref_cols] - ideal) / 45 * 100), 0, 100)
+        else:
+            accuracy = np.zeros((len(people), 0))
+
+        seen = ~np.isnan(accuracy)
+        counts = seen.sum(axis=1)
+        overall = np.where(counts > 0, np.nansum(accuracy, axis=1) / np.maximum(counts, 1), 0)
+        for i, person in enumerate(people):
+            person.angles = {n: int(angles[i, j]) for j, n in enumerate(names) if not np.isnan(angles[i, j])}
+            person.accuracy = {n: int(accuracy[i, j]) for j, n in enumerate(ref_names) if seen[i, j]}
+            person.accuracy['Overall'] = int(overall[i])
+            if person.rep_angle in person.angles:
+                person.rep_counter.update(person.angles[person.rep_angle])
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    In-process sampling profiler for the running app.
+    A sampler thread periodically snapshots the Python stacks of the watched
+    threads and writes them as collapsed stacks ("thread;outer;inner count"),
+    which speedscope and flamegraph.pl both open directly.
+    """
+    def __init__(self, threads, output_dir, duration=10.0, interval=0.005, tags=None, on_finished=None):
+        # Callable returning {name: thread ident}, resolved on every sample so threads may start late
+        self.threads = threads
+        self.output_dir = output_dir
+        self.duration = duration
+        self.interval = interval
+        self.tags = tags or {}
+        self.on_finished = on_finished
+        self.samples = Counter()
+        self.sample_count = 0
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Begin sampling in the background; does nothing if already running"""
+        if self.running:
+            return
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        started = time.time()
+        deadline = time.monotonic() + self.duration
+        while time.monotonic() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+        path = self.write(started)
+        if self.on_finished:
+            self.on_finished(path)
+
+    def sample(self):
+        """Record the current stack of every watched thread"""
+        frames = sys._current_frames()
+        for name, ident in self.threads().items():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(name)
+            self.samples[';'.join(reversed(stack))] += 1
+        self.sample_count += 1
+
+    def write(self, started):
+        """Write the collapsed stacks and a metadata sidecar; returns the profile path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        tag = '-'.join(str(v).replace(' ', '_') for v in self.tags.values())
+        base = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}")
+        if tag:
+            base += f"-{tag}"
+
+        path = base + '.collapsed.txt'
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(base + '.json', 'w') as f:
+            json.dump({
+                'started_at': started,
+                'duration': self.duration,
+                'interval': self.interval,
+                'samples': self.sample_count,
+                'tags': self.tags
+            }, f, indent=2)
+        return path
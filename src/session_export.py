@@ -0,0 +1,289 @@
+import json
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from movenet_model import draw_keypoints
+
+
+def pose_dtype(angle_count):
+    """One recorded frame's pose row, as streamed to poses.bin"""
+    return np.dtype([
+        ('timestamp', np.float64),
+        ('keypoints', np.float32, (17, 3)),
+        ('angles', np.float32, (angle_count,)),
+        ('accuracy', np.float32)
+    ])
+
+
+def prune_sessions(sessions_dir, max_sessions=20, max_bytes=8 * 2**30, keep_latest=2):
+    """
+    Delete the oldest session folders until at most `max_sessions` remain and they
+    take at most `max_bytes`. The `keep_latest` newest are never removed, the last
+    closed session may still be exporting.
+    Returns the removed folders.
+    """
+    if not os.path.isdir(sessions_dir):
+        return []
+    sessions = [os.path.join(sessions_dir, name) for name in os.listdir(sessions_dir)]
+    sessions = sorted((p for p in sessions if os.path.isdir(p)), key=os.path.getmtime)
+    sizes = {
+        path: sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+        for path in sessions
+    }
+    total = sum(sizes.values())
+    removed = []
+    for path in sessions[:max(0, len(sessions) - keep_latest)]:
+        if len(sessions) - len(removed) <= max_sessions and total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= sizes[path]
+        removed.append(path)
+    return removed
+
+
+class SessionRecorder:
+    """
+    Records the raw trainee feed and per-frame pose data of a session.
+    Encoding happens on a background thread; if it falls behind, frames are
+    dropped rather than stalling the capture loop.
+    Frames arrive at the processing rate, not at `fps`: each one is repeated or
+    skipped by its arrival time so trainee.avi plays back in real time, and pose
+    rows are streamed to disk alongside, one per video frame.
+    `on_written(frame)` is called once a frame has been encoded or dropped,
+    e.g. to hand a pooled buffer back.
+    """
+    def __init__(self, session_dir, fps, frame_size, max_queue=60, on_written=None, max_gap=1.0):
+        self.session_dir = session_dir
+        os.makedirs(session_dir, exist_ok=True)
+        self.fps = fps
+        self.frame_size = frame_size
+        # Longer stalls (e.g. while paused) are cut out instead of filled with repeats
+        self.max_gap = max_gap
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.started_at = time.monotonic()
+        self.on_written = on_written
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    @property
+    def duration(self):
+        """Seconds since the recording started"""
+        return time.monotonic() - self.started_at
+
+    def record(self, frame, keypoints, angles, accuracy, timestamp):
+        """Queue one frame; the caller must not modify `frame` afterwards"""
+        try:
+            self.queue.put_nowait((frame, keypoints, angles, accuracy, timestamp, time.monotonic()))
+        except queue.Full:
+            self.dropped += 1
+            if self.on_written:
+                self.on_written(frame)
+
+    def close(self):
+        """Flush outstanding frames and finalize the session files"""
+        self.queue.put(None)
+        self.thread.join()
+
+    def _write_loop(self):
+        writer = cv2.VideoWriter(
+            os.path.join(self.session_dir, 'trainee.avi'),
+            cv2.VideoWriter_fourcc(*'MJPG'), self.fps, self.frame_size
+        )
+        rows_path = os.path.join(self.session_dir, 'poses.bin')
+        angle_names = None
+        row = None
+        slots = 0
+        origin = None
+        with open(rows_path, 'wb') as rows:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                frame, kp, ang, acc, timestamp, arrived = item
+                if angle_names is None:
+                    angle_names = list(ang.keys())
+                    row = np.zeros(1, dtype=pose_dtype(len(angle_names)))
+                    origin = arrived
+
+                # Video frame slots this frame covers on the real-time timeline
+                due = int((arrived - origin) * self.fps) + 1
+                if due - slots > self.max_gap * self.fps:
+                    origin += (due - slots - 1) / self.fps
+                    due = slots + 1
+                if due > slots:
+                    row['timestamp'] = timestamp
+                    row['keypoints'] = kp
+                    row['angles'] = [ang.get(name, np.nan) for name in angle_names]
+                    row['accuracy'] = acc.get('Overall', 0)
+                    for _ in range(due - slots):
+                        writer.write(frame)
+                        rows.write(row.tobytes())
+                    slots = due
+                if self.on_written:
+                    self.on_written(frame)
+        writer.release()
+
+        # Export reads the compact npz; the stream only lives as long as the recording
+        poses = np.fromfile(rows_path, dtype=pose_dtype(len(angle_names or [])))
+        np.savez(
+            os.path.join(self.session_dir, 'poses.npz'),
+            timestamps=poses['timestamp'],
+            keypoints=poses['keypoints'],
+            angles=poses['angles'],
+            accuracy=poses['accuracy']
+        )
+        os.remove(rows_path)
+        with open(os.path.join(self.session_dir, 'session.json'), 'w') as f:
+            json.dump({'fps': self.fps, 'angle_names': angle_names or [], 'dropped': self.dropped}, f)
+
+
+def status_color(accuracy):
+    """BGR colour matching the accuracy widget thresholds"""
+    if accuracy >= 80:
+        return (120, 187, 72)
+    elif accuracy >= 60:
+        return (75, 201, 236)
+    return (101, 101, 245)
+
+
+def _render_chunk(session_dir, trainer_path, start, end, chunk_path):
+    """Worker process: render frames [start, end) of a session to its own video file"""
+    with open(os.path.join(session_dir, 'session.json')) as f:
+        meta = json.load(f)
+    poses = np.load(os.path.join(session_dir, 'poses.npz'))
+    keypoints, angles, accuracy, timestamps = poses['keypoints'], poses['angles'], poses['accuracy'], poses['timestamps']
+
+    trainee = cv2.VideoCapture(os.path.join(session_dir, 'trainee.avi'))
+    trainee.set(cv2.CAP_PROP_POS_FRAMES, start)
+    trainer = cv2.VideoCapture(trainer_path) if trainer_path else None
+    trainer_fps = (trainer.get(cv2.CAP_PROP_FPS) or 30.0) if trainer else 30.0
+    trainer_total = int(trainer.get(cv2.CAP_PROP_FRAME_COUNT)) if trainer else 0
+    trainer_pos = -1
+    trainer_frame = None
+
+    writer = None
+    for i in range(start, end):
+        ret, frame = trainee.read()
+        if not ret:
+            break
+        h, w = frame.shape[:2]
+        draw_keypoints(frame, keypoints[i])
+
+        # Trainer frame aligned on the shared media timeline
+        panel = np.zeros_like(frame)
+        if trainer is not None and trainer_total > 0:
+            target = int(timestamps[i] * trainer_fps) % trainer_total
+            if target != trainer_pos:
+                if target < trainer_pos or target - trainer_pos > trainer_fps:
+                    trainer.set(cv2.CAP_PROP_POS_FRAMES, target)
+                else:
+                    for _ in range(target - trainer_pos - 1):
+                        trainer.grab()
+                ret, trainer_frame = trainer.read()
+                trainer_pos = target
+                if not ret:
+                    # Start over from a known position on the next frame
+                    trainer.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    trainer_pos = -1
+                    trainer_frame = None
+            if trainer_frame is not None:
+                panel = cv2.resize(trainer_frame, (w, h))
+
+        # Annotations: overall accuracy bar and joint angles
+        acc = float(accuracy[i])
+        cv2.rectangle(frame, (0, h - 8), (int(w * acc / 100), h), status_color(acc), -1)
+        cv2.putText(frame, f"Accuracy: {acc:.0f}%", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, status_color(acc), 2)
+        for j, name in enumerate(meta['angle_names']):
+            cv2.putText(frame, f"{name}: {angles[i, j]:.0f}", (10, 60 + 28 * j),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+        combined = np.hstack((panel, frame))
+        if writer is None:
+            writer = cv2.VideoWriter(chunk_path, cv2.VideoWriter_fourcc(*'mp4v'), meta['fps'],
+                                     (combined.shape[1], combined.shape[0]))
+        writer.write(combined)
+
+    if writer is not None:
+        writer.release()
+    trainee.release()
+    if trainer is not None:
+        trainer.release()
+    return chunk_path
+
+
+def _stitch(chunk_paths, output_path, fps):
+    """Concatenate rendered chunks into the final file"""
+    chunk_paths = [p for p in chunk_paths if os.path.exists(p)]
+    if shutil.which('ffmpeg'):
+        # Stream copy, no re-encode
+        list_path = output_path + '.txt'
+        with open(list_path, 'w') as f:
+            f.writelines(f"file '{os.path.abspath(p)}'\n" for p in chunk_paths)
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+             '-i', list_path, '-c', 'copy', output_path]
+        )
+        os.remove(list_path)
+        if result.returncode == 0:
+            return
+
+    writer = None
+    for path in chunk_paths:
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if writer is None:
+                writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps,
+                                         (frame.shape[1], frame.shape[0]))
+            writer.write(frame)
+        cap.release()
+    if writer is not None:
+        writer.release()
+
+
+def export_session(session_dir, output_path, trainer_path=None, workers=None, chunk_frames=300, progress=None):
+    """
+    Render an annotated side-by-side comparison video of a recorded session.
+    Chunks of frames are rendered in parallel worker processes and then stitched.
+    `progress(done, total)` is called as chunks finish.
+    """
+    with open(os.path.join(session_dir, 'session.json')) as f:
+        meta = json.load(f)
+    total = len(np.load(os.path.join(session_dir, 'poses.npz'))['timestamps'])
+    ranges = [(start, min(start + chunk_frames, total)) for start in range(0, total, chunk_frames)]
+
+    tmp_dir = tempfile.mkdtemp(prefix='session_export_')
+    try:
+        chunk_paths = [os.path.join(tmp_dir, f"chunk_{i:05d}.mp4") for i in range(len(ranges))]
+        done = 0
+        # Spawned workers: forking a process that runs Qt threads is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+            futures = [
+                pool.submit(_render_chunk, session_dir, trainer_path, start, end, path)
+                for (start, end), path in zip(ranges, chunk_paths)
+            ]
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                if progress:
+                    progress(done, len(futures) + 1)
+
+        _stitch(chunk_paths, output_path, meta['fps'])
+        if progress:
+            progress(len(ranges) + 1, len(ranges) + 1)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return output_path
@@ -0,0 +1,359 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QTimer
+
+try:
+    import resource
+except ImportError:  # not on Windows, /proc is used where available
+    resource = None
+
+# Smallest growth per hour that counts as a leak, per metric; scaled to the measured period,
+# so short runs catch a leak at the rate a long one would
+GROWTH_PER_HOUR = {
+    'rss': 4 * 2 ** 20,
+    'heap': 2 * 2 ** 20,
+    'widgets': 2,
+    'qobjects': 5,
+    'gc_objects': 1000,
+    'threads': 1,
+    'frame_pool_in_use': 1
+}
+# Growth below this is noise however long the run
+MIN_GROWTH = {
+    'rss': 2 ** 20,
+    'heap': 2 ** 19,
+    'widgets': 1,
+    'qobjects': 1,
+    'gc_objects': 1000,
+    'threads': 1,
+    'frame_pool_in_use': 1
+}
+# Fraction of sample-to-sample changes that must be increases to call growth monotonic
+MIN_INCREASING = 0.6
+# A single step up is a plateau, e.g. a cache filling, not a leak
+MIN_RISES = 3
+# Processing rate drop, relative to the start, that counts as slowing down
+MAX_RATE_DROP = 0.2
+
+
+class SyntheticCapture:
+    """
+    Stands in for cv2.VideoCapture: an endless test pattern with a moving shape.
+    Frames are produced as fast as they are read, and the shape jumps well
+    over its own size every frame, so consecutive frames always differ
+    enough for the motion gate to keep running inference at any read rate.
+    """
+    def __init__(self, source=0, width=640, height=480, fps=30.0, step=1.0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        # Phase advance per frame, in radians of the shape's path
+        self.step = step
+        self.position = 0
+        self.opened = True
+        y, x = np.mgrid[0:height, 0:width]
+        self.background = np.dstack([
+            x * 255 // width, y * 255 // height, np.full((height, width), 64)
+        ]).astype(np.uint8)
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, image
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+        t = self.position * self.step
+        centre = (int(self.width * (0.5 + 0.3 * np.sin(t))), int(self.height * (0.5 + 0.2 * np.sin(2 * t))))
+        cv2.circle(image, centre, self.height // 8, (255, 255, 255), -1)
+        self.position += 1
+        return True, image
+
+    def grab(self):
+        self.position += 1
+        return self.opened
+
+    def get(self, prop):
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_POS_FRAMES: self.position
+        }.get(prop, 0.0)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(value)
+            return True
+        return False
+
+    def release(self):
+        self.opened = False
+
+
+def write_trainer_video(path, seconds=10, fps=30.0):
+    """Short synthetic trainer video, so playback, seeking and the timeline are exercised too"""
+    # Smooth motion, like a real trainer video
+    source = SyntheticCapture(width=640, height=360, fps=fps, step=1 / fps)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (source.width, source.height))
+    for _ in range(int(seconds * fps)):
+        writer.write(source.read()[1])
+    writer.release()
+    return path
+
+
+def rss_bytes():
+    """Current resident set size, or the peak where only that is available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def trend(times, values, threshold=None):
+    """Linear growth and monotonicity of one metric; flagged when it keeps climbing past the threshold"""
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(values) < 3:
+        return None
+    slope = float(np.polyfit(times / 3600, values, 1)[0])
+    steps = np.diff(values)
+    changes = steps[steps != 0]
+    rises = int((changes > 0).sum())
+    increasing = rises / changes.size if changes.size else 0.0
+    growth = slope * (times[-1] - times[0]) / 3600
+    result = {
+        'start': float(values[0]),
+        'end': float(values[-1]),
+        'slope_per_hour': slope,
+        'growth': growth,
+        'increasing': round(increasing, 3),
+        'rises': rises,
+        'flagged': False
+    }
+    if threshold is not None:
+        result['threshold'] = threshold
+        result['flagged'] = bool(growth >= threshold and increasing >= MIN_INCREASING and rises >= MIN_RISES)
+    return result
+
+
+class SoakMonitor:
+    """
+    Drives a WorkoutTrainerUI through a repeating scenario and samples memory,
+    heap and Qt object counts. Only samples taken after the warm-up are used for
+    the report, so caches filling up and the model loading are not mistaken for
+    leaks.
+    """
+    def __init__(self, window, duration, interval=60.0, warmup=300.0, scenario_interval=5.0, top_sites=15):
+        self.window = window
+        self.duration = duration
+        self.warmup = min(warmup, duration / 4)
+        self.top_sites = top_sites
+        self.samples = []
+        self.baseline = None
+        self.baseline_at = None
+        self.step = 0
+        self.last_frames = 0
+        self.started = time.monotonic()
+        self.last_sample = self.started
+
+        self.sample_timer = QTimer()
+        self.sample_timer.timeout.connect(self.sample)
+        self.sample_timer.start(int(interval * 1000))
+        self.scenario_timer = QTimer()
+        self.scenario_timer.timeout.connect(self.next_step)
+        self.scenario_timer.start(int(scenario_interval * 1000))
+        self.finished = False
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def next_step(self):
+        """Exercise the paths that allocate on user actions: play/pause, exercise changes, source resets"""
+        self.step += 1
+        window = self.window
+        if window.trainer_video_playing:
+            window.pause_video()
+        else:
+            window.play_video()
+        if self.step % 3 == 0:
+            combo = window.exercise_combo
+            combo.setCurrentIndex((combo.currentIndex() + 1) % combo.count())
+        if self.step % 60 == 0:
+            window.reset_camera()
+
+    def sample(self):
+        now = time.monotonic()
+        elapsed = now - self.started
+        pipeline = self.window.video_thread.pipeline_stats()
+        frames = pipeline['frames_processed']
+        pool = pipeline['frame_pool']
+        gate = pipeline['motion_gate']
+        heap, _ = tracemalloc.get_traced_memory()
+        self.samples.append({
+            'elapsed': round(elapsed, 1),
+            'rss': rss_bytes(),
+            'heap': heap,
+            'widgets': len(QApplication.allWidgets()),
+            'qobjects': len(self.window.findChildren(QObject)),
+            'gc_objects': len(gc.get_objects()),
+            'threads': threading.active_count(),
+            'frame_pool_in_use': pool.get('in_use', 0),
+            'frame_pool_leaked': pool.get('leaked', 0),
+            'frame_pool_exhausted': pool.get('exhausted', 0),
+            'inference_skip_rate': gate['skip_rate'],
+            'fps': (frames - self.last_frames) / max(now - self.last_sample, 1e-6)
+        })
+        self.last_frames = frames
+        self.last_sample = now
+        if self.baseline is None and elapsed >= self.warmup:
+            self.baseline = self.snapshot()
+            self.baseline_at = elapsed
+        if elapsed >= self.duration:
+            self.finish()
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>')
+        ))
+
+    def report(self):
+        """Growth trends after warm-up, plus the allocation sites that grew the most"""
+        # The baseline snapshot stays in memory, trends start after it was taken
+        if self.baseline_at is not None:
+            measured = [s for s in self.samples if s['elapsed'] > self.baseline_at]
+        else:
+            measured = [s for s in self.samples if s['elapsed'] >= self.warmup]
+        times = [s['elapsed'] for s in measured]
+        hours = (times[-1] - times[0]) / 3600 if times else 0.0
+        trends = {
+            name: trend(times, [s[name] for s in measured], max(rate * hours, MIN_GROWTH[name]))
+            for name, rate in GROWTH_PER_HOUR.items()
+        }
+        rate = trend(times, [s['fps'] for s in measured])
+        if rate is not None:
+            rate['flagged'] = bool(rate['start'] > 0 and rate['slope_per_hour'] < 0
+                                   and -rate['growth'] >= MAX_RATE_DROP * rate['start'])
+        trends['fps'] = rate
+
+        sites = []
+        if self.baseline is not None:
+            for stat in self.snapshot().compare_to(self.baseline, 'lineno')[:self.top_sites]:
+                frame = stat.traceback[0]
+                sites.append({
+                    'site': f"{frame.filename}:{frame.lineno}",
+                    'size_diff': stat.size_diff,
+                    'count_diff': stat.count_diff,
+                    'size': stat.size
+                })
+
+        return {
+            'duration': round(self.elapsed(), 1),
+            'warmup': self.warmup,
+            'frames_processed': self.window.video_thread.frames_processed,
+            'flagged': sorted(name for name, t in trends.items() if t and t['flagged']),
+            'trends': trends,
+            'top_sites': sites,
+            'samples': self.samples
+        }
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.sample_timer.stop()
+        self.scenario_timer.stop()
+        self.result = self.report()
+        QApplication.instance().quit()
+
+
+def format_report(report):
+    lines = [
+        f"Soak test: {report['duration'] / 3600:.2f} h, {report['frames_processed']} frames "
+        f"(first {report['warmup']:.0f} s ignored)",
+        "Flagged: " + (", ".join(report['flagged']) if report['flagged'] else "none"),
+        ""
+    ]
+    for name, t in report['trends'].items():
+        if t is None:
+            continue
+        mark = "!!" if t['flagged'] else "  "
+        lines.append(f"{mark} {name:<18} {t['start']:>14.1f} -> {t['end']:>14.1f}  "
+                     f"{t['slope_per_hour']:>+14.1f}/h  increasing {t['increasing']:.0%} ({t['rises']} rises)")
+    if report['top_sites']:
+        lines += ["", "Top heap growth since warm-up:"]
+        for site in report['top_sites']:
+            lines.append(f"  {site['size_diff'] / 1024:>+10.1f} KiB {site['count_diff']:>+8} blocks  {site['site']}")
+    return "\n".join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run the AI Workout Trainer headless on a synthetic source and track resource growth")
+    parser.add_argument("--hours", type=float, default=12.0, help="how long to run")
+    parser.add_argument("--interval", type=float, default=60.0, metavar="SECONDS", help="time between samples")
+    parser.add_argument("--warmup", type=float, default=300.0, metavar="SECONDS",
+                        help="samples before this are not used for growth trends")
+    parser.add_argument("--frame-interval", type=int, default=0, metavar="MS",
+                        help="sleep between frames; 0 runs at maximum rate")
+    parser.add_argument("--report", default=None, help="JSON report path; a text summary is written next to it")
+    parser.add_argument("--data-dir", default=None, help="data directory for sessions and analytics (default: a temporary one)")
+    parser.add_argument("--no-record", action="store_true", help="don't record sessions to disk, which the app does by default")
+    parser.add_argument("--multi-person", action="store_true", help="run the multi-person tracking path")
+    parser.add_argument("--trace-depth", type=int, default=1, help="tracemalloc frames kept per allocation")
+    return parser.parse_args(argv[1:])
+
+
+def main():
+    args = parse_args(sys.argv)
+    # These are read when Qt starts and when the app module is imported
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='workout-soak-')
+    os.environ['WORKOUT_TRAINER_DATA'] = data_dir
+    os.environ['WORKOUT_TRAINER_USER'] = 'soak-test'
+    report_path = args.report or f"soak-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+    tracemalloc.start(args.trace_depth)
+    app = QApplication(sys.argv[:1])
+    from workout_trainer_with_movenet import WorkoutTrainerUI
+
+    window = WorkoutTrainerUI(multi_person=args.multi_person, audio=False, capture_factory=SyntheticCapture,
+                              frame_interval=args.frame_interval, record_session=not args.no_record)
+    window.show()
+    window.load_trainer_video(write_trainer_video(os.path.join(data_dir, 'trainer.avi')))
+    window.play_video()
+    monitor = SoakMonitor(window, args.hours * 3600, interval=args.interval, warmup=args.warmup)
+    app.exec()
+    window.close()
+
+    report = monitor.result if monitor.finished else monitor.report()
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    summary = format_report(report)
+    with open(os.path.splitext(report_path)[0] + '.txt', 'w') as f:
+        f.write(summary + "\n")
+    print(summary)
+    # Non-zero when anything grew, so the run can gate a deployment
+    sys.exit(1 if report['flagged'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import queue
+
+import cv2
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRectF, QThread, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen
+
+
+def video_cache_key(path):
+    """Stable key for a video file, changing whenever the file does"""
+    stat = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()
+
+
+class ThumbnailLoader(QThread):
+    """Decodes trainer video thumbnails on demand, caching them on disk per video"""
+    thumbnail_ready = pyqtSignal(int, QImage)
+
+    def __init__(self, video_path, cache_dir, height=54):
+        super().__init__()
+        self.video_path = video_path
+        self.cache_dir = os.path.join(cache_dir, video_cache_key(video_path))
+        self.height = height
+        self.requests = queue.LifoQueue()
+        self.done = set()
+        self.running = False
+
+    def request(self, frames):
+        """Ask for thumbnails of these frames; the most recent request is served first"""
+        for frame in reversed(frames):
+            if frame not in self.done:
+                self.requests.put(frame)
+
+    def run(self):
+        self.running = True
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Own capture, so decoding never moves the playback position
+        cap = cv2.VideoCapture(self.video_path)
+        while self.running:
+            try:
+                frame_index = self.requests.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if frame_index in self.done:
+                continue
+
+            path = os.path.join(self.cache_dir, f"{frame_index}.jpg")
+            thumb = cv2.imread(path) if os.path.exists(path) else None
+            if thumb is None:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                ret, frame = cap.read()
+                if not ret:
+                    continue
+                h, w = frame.shape[:2]
+                thumb = cv2.resize(frame, (max(1, w * self.height // h), self.height), interpolation=cv2.INTER_AREA)
+                cv2.imwrite(path, thumb)
+
+            rgb = cv2.cvtColor(thumb, cv2.COLOR_BGR2RGB)
+            h, w, ch = rgb.shape
+            # copy() detaches the image from the numpy buffer before it crosses threads
+            image = QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888).copy()
+            self.done.add(frame_index)
+            self.thumbnail_ready.emit(frame_index, image)
+        cap.release()
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+
+class AccuracyHeatStrip:
+    """Mean accuracy per timeline segment, updated one sample at a time"""
+    def __init__(self, duration, segments=200):
+        self.duration = max(duration, 1e-6)
+        self.sums = np.zeros(segments)
+        self.counts = np.zeros(segments, dtype=np.int64)
+
+    def add(self, seconds, accuracy):
+        i = int(seconds / self.duration * len(self.sums))
+        if 0 <= i < len(self.sums):
+            self.sums[i] += accuracy
+            self.counts[i] += 1
+
+    def means(self):
+        """Per-segment mean accuracy, NaN where nothing has been scored yet"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums / self.counts, np.nan)
+
+
+class TrainerTimeline(QWidget):
+    """Scrub bar under the trainer video: lazy thumbnails, accuracy heat strip and playhead"""
+    seek_requested = pyqtSignal(int)
+
+    def __init__(self, cache_dir, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.thumb_height = 54
+        self.strip_height = 8
+        self.setFixedHeight(self.thumb_height + self.strip_height + 6)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.loader = None
+        self.thumbnails = {}
+        self.total_frames = 0
+        self.fps = 30.0
+        self.position = 0
+        self.heat = None
+
+    def set_video(self, path, total_frames, fps):
+        """Show a new trainer video; thumbnails are decoded as they become visible"""
+        self.stop()
+        self.thumbnails = {}
+        self.total_frames = total_frames
+        self.fps = fps
+        self.position = 0
+        self.heat = AccuracyHeatStrip(total_frames / fps if fps else 0)
+        self.loader = ThumbnailLoader(path, self.cache_dir, self.thumb_height)
+        self.loader.thumbnail_ready.connect(self.add_thumbnail)
+        self.loader.start()
+        self.request_visible()
+        self.update()
+
+    def stop(self):
+        if self.loader is not None:
+            self.loader.stop()
+            self.loader = None
+
+    def slot_frames(self):
+        """Frame shown in each thumbnail slot that fits the current width"""
+        if self.total_frames <= 0:
+            return []
+        slot_width = self.thumb_height * 16 // 9
+        slots = max(1, self.width() // slot_width)
+        return [int((i + 0.5) * self.total_frames / slots) for i in range(slots)]
+
+    def request_visible(self):
+        if self.loader is not None:
+            self.loader.request(self.slot_frames())
+
+    def add_thumbnail(self, frame_index, image):
+        self.thumbnails[frame_index] = image
+        self.update()
+
+    def set_position(self, frame_index):
+        self.position = frame_index
+        self.update()
+
+    def add_accuracy(self, seconds, accuracy):
+        """Score a moment of the trainer video; only the strip is repainted"""
+        if self.heat is not None:
+            self.heat.add(seconds, accuracy)
+            self.update(0, self.thumb_height, self.width(), self.strip_height + 6)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.request_visible()
+
+    def mousePressEvent(self, event):
+        self.seek_to(event.position().x())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self.seek_to(event.position().x())
+
+    def seek_to(self, x):
+        if self.total_frames > 0:
+            frame = int(np.clip(x / max(1, self.width()), 0, 1) * (self.total_frames - 1))
+            self.seek_requested.emit(frame)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#0D1117"))
+        if self.total_frames <= 0:
+            return
+
+        # Thumbnails, placeholders until decoded
+        frames = self.slot_frames()
+        slot_width = self.width() / len(frames)
+        for i, frame in enumerate(frames):
+            rect = QRectF(i * slot_width, 0, slot_width - 1, self.thumb_height)
+            image = self.thumbnails.get(frame)
+            if image is not None:
+                painter.drawImage(rect, image)
+            else:
+                painter.fillRect(rect, QColor("#1A202C"))
+
+        # Accuracy heat strip
+        if self.heat is not None:
+            means = self.heat.means()
+            segment_width = self.width() / len(means)
+            y = self.thumb_height + 3
+            for i, value in enumerate(means):
+                if np.isnan(value):
+                    color = QColor("#2D3748")
+                elif value >= 80:
+                    color = QColor("#48BB78")
+                elif value >= 60:
+                    color = QColor("#ECC94B")
+                else:
+                    color = QColor("#F56565")
+                painter.fillRect(QRectF(i * segment_width, y, segment_width + 1, self.strip_height), color)
+
+        # Playhead
+        x = self.position / max(1, self.total_frames - 1) * self.width()
+        painter.setPen(QPen(QColor("#38B2AC"), 2))
+        painter.drawLine(int(x), 0, int(x), self.height())
@@ -1,115 +1,306 @@
 import sys
 import os
+import time
+import getpass
+import argparse
+import threading
+import queue
+from collections import deque
+import tempfile
 import cv2
 import numpy as np
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QPushButton, QProgressBar, QFrame, QGridLayout, 
-    QComboBox, QFileDialog, QSizePolicy
+    QComboBox, QFileDialog, QSizePolicy, QCheckBox
 )
 from PyQt6.QtCore import Qt, QSize, pyqtSlot, QTimer, QThread, pyqtSignal
-from PyQt6.QtGui import QColor, QFont, QPixmap, QIcon, QImage
+from PyQt6.QtGui import QColor, QFont, QPixmap, QIcon, QImage, QShortcut, QKeySequence
 
-# Placeholder for MoveNet integration
-# In a real implementation, you would import TensorFlow and the MoveNet model
-class MoveNetModel:
-    """Placeholder for the MoveNet model integration"""
-    def __init__(self):
-        # In a real implementation, this would load the MoveNet model
-        self.keypoints = None
-        
-    def detect_pose(self, image):
-        """
-        Placeholder for pose detection
-        In a real implementation, this would run the MoveNet model on the image
-        """
-        # Simulate detecting keypoints
-        # In a real implementation, this would return actual keypoints from MoveNet
-        # Format: [y, x, score] for each keypoint
-        keypoints = np.random.rand(17, 3)
-        keypoints[:, 2] = keypoints[:, 2] * 0.8 + 0.2  # Adjust confidence scores to be between 0.2 and 1.0
-        self.keypoints = keypoints
-        return keypoints
-    
-    def calculate_angles(self):
-        """
-        Calculate joint angles based on detected keypoints
-        In a real implementation, this would use actual keypoint coordinates
-        """
-        # Simulate joint angles
-        # In a real implementation, this would calculate angles from actual keypoints
-        angles = {
-            'Hip': 120,
-            'Knee': 145,
-            'Elbow': 90
-        }
-        return angles
-    
-    def calculate_accuracy(self, reference_angles):
-        """
-        Calculate accuracy compared to reference angles
-        In a real implementation, this would compare actual angles with reference
-        """
-        # Simulate accuracy scores
-        # In a real implementation, this would calculate actual accuracy
-        accuracy = {
-            'Hip': 85,
-            'Knee': 45,
-            'Elbow': 65,
-            'Overall': 85
-        }
-        return accuracy
-    
-    def get_feedback(self):
-        """
-        Generate feedback based on pose comparison
-        In a real implementation, this would analyze the pose and provide real feedback
-        """
-        # Simulate feedback
-        # In a real implementation, this would generate actual feedback
-        feedback = [
-            {'text': 'Knee angle within optimal range', 'status': 'good'},
-            {'text': 'Slightly adjust hip position', 'status': 'warning'},
-            {'text': 'Keep your back straight', 'status': 'error'}
-        ]
-        return feedback
+from feedback_rules import FeedbackRuleEngine, REFERENCE_ANGLES, exercise_rules
+from movenet_model import MoveNetModel, draw_keypoints, draw_people
+from media_clock import MediaClock
+from session_export import SessionRecorder, export_session, prune_sessions
+from frame_pool import FramePool
+from pose_history import PoseHistory, RepCounter, REP_ANGLES
+from analytics_store import AnalyticsStore
+from profiler_capture import SamplingProfiler
+from pose_tracker import PoseTracker
+from motion_gate import MotionGate
+from body_calibration import BodyCalibrator, CalibrationProfile
+from exercise_classifier import ExerciseClassifier
+from trainer_timeline import TrainerTimeline
+from pose_publisher import PosePublisher, DEFAULT_NAME as DEFAULT_POSE_STREAM
+from audio_cues import CueScheduler
+
+# Where sessions and other per-station data are kept
+DATA_DIR = os.environ.get('WORKOUT_TRAINER_DATA', os.path.join(os.path.expanduser('~'), '.ai_workout_trainer'))
+USER_ID = os.environ.get('WORKOUT_TRAINER_USER') or getpass.getuser()
 
 class VideoThread(QThread):
     """Thread for processing video frames"""
-    frame_update = pyqtSignal(np.ndarray)
+    frame_update = pyqtSignal(np.ndarray, float)
     pose_update = pyqtSignal(dict, dict, list, str)
+    session_closed = pyqtSignal(str)
+    people_update = pyqtSignal(list)
+    exercise_detected = pyqtSignal(str)
+    calibration_finished = pyqtSignal(str)
     
-    def __init__(self, camera_id=0):
+    def __init__(self, camera_id=0, clock=None, record_session=True, analytics=None, user_id=USER_ID,
+                 multi_person=False, publish_name=None, cues=None, capture_factory=cv2.VideoCapture,
+                 frame_interval=30, session_minutes=15):
         super().__init__()
         self.camera_id = camera_id
+        # Anything with the cv2.VideoCapture interface, e.g. a synthetic source for soak tests
+        self.capture_factory = capture_factory
+        # Milliseconds to sleep between frames, 0 runs at the source's maximum rate
+        self.frame_interval = frame_interval
+        self.frames_processed = 0
+        # Trainee frames are stamped on the same timeline as trainer playback
+        self.clock = clock or MediaClock()
         self.running = False
+        self.paused = False
+        self.thread_ident = None
+        # Commands applied between frames, so the thread and model never need restarting
+        self.commands = queue.Queue()
         self.model = MoveNetModel()
-        self.reference_angles = {
-            'Hip': 120,
-            'Knee': 145,
-            'Elbow': 90
+        self.exercise = 'Squats'
+        self.reference_angles = dict(REFERENCE_ANGLES[self.exercise])
+        self.feedback_engine = FeedbackRuleEngine(exercise_rules(self.exercise))
+        
+        # Raw frames and pose data are recorded so the session can be exported later;
+        # recordings are split per exercise and every `session_minutes`, old ones are pruned
+        self.record_session = record_session
+        self.session_minutes = session_minutes
+        self.recorder = None
+        
+        # Reusable frame buffers, sized once the capture profile is known
+        self.frame_pool = None
+        self.capture_profile = None
+        
+        # Recent poses for kinematics queries, sized once the capture rate is known
+        self.history = None
+        
+        # Session, rep and frame metrics persisted for the user's history
+        self.analytics = analytics
+        self.user_id = user_id
+        self.analytics_session = None
+        self.rep_counter = RepCounter(*REP_ANGLES[self.exercise][1:])
+        # (monotonic time, overall accuracy) of the frames since the current rep started
+        self.rep_accuracy = deque()
+        
+        # Group classes: every person gets a stable ID and their own scoring
+        self.multi_person = multi_person
+        self.tracker = PoseTracker(self.exercise, self.reference_angles)
+        
+        # Skips pose detection while the scene is static or empty
+        self.motion_gate = MotionGate()
+        
+        # Recognizes the exercise being done and switches references automatically
+        self.auto_exercise = True
+        self.classifier = ExerciseClassifier()
+        
+        # Optional pose stream for other local processes (overlays, loggers, scoreboards)
+        self.publish_name = publish_name
+        self.publisher = None
+        
+        # Spoken coaching cues, played on their own thread
+        self.cues = cues
+        
+        # The user's body proportions, used to reject implausible keypoints before scoring
+        self.calibration_path = os.path.join(DATA_DIR, 'calibration', f"{user_id}.json")
+        self.calibration = CalibrationProfile.load(self.calibration_path)
+        self.calibrator = None
+        
+    def open_recorder(self, cap, frame):
+        """Start recording a new session into its own directory"""
+        sessions_dir = os.path.join(DATA_DIR, 'sessions')
+        os.makedirs(sessions_dir, exist_ok=True)
+        prune_sessions(sessions_dir)
+        # Unique even when a session is closed and the next one opens within the same second
+        session_dir = tempfile.mkdtemp(prefix=time.strftime('%Y%m%d-%H%M%S-'), dir=sessions_dir)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.recorder = SessionRecorder(
+            session_dir, fps, (frame.shape[1], frame.shape[0]),
+            on_written=self.frame_pool.release
+        )
+        
+    def close_recorder(self):
+        """Finish the current session recording and announce it"""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.session_closed.emit(self.recorder.session_dir)
+            self.recorder = None
+        
+    def send(self, command, *args):
+        """
+        Queue a command for the capture loop, applied before the next frame:
+        ('source', camera_id_or_path), ('exercise', name), ('pause',), ('resume',),
+        ('reset',), ('close_session',), ('auto_exercise', enabled) and ('calibrate',)
+        """
+        self.commands.put((command,) + args)
+        
+    def open_capture(self):
+        """Open the current source and size the buffers from its capture profile"""
+        cap = self.capture_factory(self.camera_id)
+        self.capture_profile = {
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': cap.get(cv2.CAP_PROP_FPS) or 30.0
         }
+        # Enough buffers for frames queued to the GUI plus those waiting on the recorder
+        self.frame_pool = FramePool.for_capture(cap, count=16)
+        # Keep the last 60 seconds of poses
+        self.history = PoseHistory(capacity=int(self.capture_profile['fps'] * 60))
+        self.rep_accuracy = deque(maxlen=self.history.capacity)
+        return cap
+        
+    def apply_commands(self, cap):
+        """Apply queued commands; returns the (possibly new) capture"""
+        while True:
+            try:
+                command, *args = self.commands.get_nowait()
+            except queue.Empty:
+                return cap
+            
+            if command == 'source':
+                # The recording belongs to the old source
+                self.close_recorder()
+                cap.release()
+                self.camera_id = args[0]
+                cap = self.open_capture()
+                self.reset_state()
+            elif command == 'exercise':
+                self.set_exercise(args[0])
+            elif command == 'pause':
+                self.paused = True
+            elif command == 'resume':
+                self.paused = False
+            elif command == 'reset':
+                self.reset_state()
+            elif command == 'close_session':
+                self.close_recorder()
+            elif command == 'auto_exercise':
+                self.auto_exercise = args[0]
+                self.classifier.reset()
+            elif command == 'calibrate':
+                # Collect about two seconds of standing poses
+                profile = self.capture_profile
+                self.calibrator = BodyCalibrator(
+                    self.user_id, profile['width'] / max(1, profile['height']), frames=int(profile['fps'] * 2)
+                )
+                
+    def set_exercise(self, exercise):
+        """Switch references, rules and rep counting to another exercise"""
+        if exercise not in REFERENCE_ANGLES or exercise == self.exercise:
+            return
+        self.exercise = exercise
+        self.reference_angles = dict(REFERENCE_ANGLES[exercise])
+        self.feedback_engine.set_rules(exercise_rules(exercise))
+        self.tracker.set_exercise(exercise, self.reference_angles)
+        self.rep_counter = RepCounter(*REP_ANGLES[exercise][1:])
+        self.rep_accuracy.clear()
+        # Recordings are per exercise too
+        self.close_recorder()
+        if self.analytics is not None:
+            # Analytics sessions are per exercise
+            self.analytics.end_session(self.analytics_session)
+            self.analytics_session = self.analytics.start_session(self.user_id, exercise)
+            
+    def reset_state(self):
+        """Forget pose history and feedback state, keeping the model loaded"""
+        self.feedback_engine.reset()
+        self.history.clear()
+        self.tracker = PoseTracker(self.exercise, self.reference_angles)
+        self.rep_counter = RepCounter(*REP_ANGLES[self.exercise][1:])
+        self.rep_accuracy.clear()
+        self.motion_gate.reset()
+        self.classifier.reset()
         
     def run(self):
         """Main thread function to capture and process video frames"""
         self.running = True
-        cap = cv2.VideoCapture(self.camera_id)
+        # Lets the profiler find this thread's stack
+        self.thread_ident = threading.get_ident()
+        cap = self.open_capture()
+        if self.publish_name:
+            self.publisher = PosePublisher(self.publish_name)
+        if self.analytics is not None:
+            self.analytics_session = self.analytics.start_session(self.user_id, self.exercise)
+        keypoints = None
+        people = []
         
         while self.running:
-            ret, frame = cap.read()
+            cap = self.apply_commands(cap)
+            if self.paused:
+                self.msleep(50)
+                continue
+            
+            # Read straight into a pooled buffer; fall back to a fresh array if the pool is exhausted
+            buf = self.frame_pool.acquire()
+            ret, frame = cap.read(buf) if buf is not None else cap.read()
+            if buf is not None and frame is not buf:
+                # Capture produced a differently sized frame, the buffer was not used
+                self.frame_pool.release(buf)
             if not ret:
-                break
+                # Camera unplugged or file ended: stay alive and wait for a new source
+                if buf is not None:
+                    self.frame_pool.release(buf)
+                self.msleep(100)
+                continue
+            timestamp = self.clock.now()
                 
-            # Process the frame with MoveNet
-            keypoints = self.model.detect_pose(frame)
+            # Process the frame with MoveNet, unless nothing has moved since the last result;
+            # calibration needs every frame of the user standing still
+            if keypoints is None or self.calibrator is not None or self.motion_gate.should_infer(frame):
+                if self.multi_person:
+                    people = self.tracker.match(self.model.detect_poses(frame))
+                    # The lowest ID drives the single-person panels
+                    if people:
+                        lead = people[0]
+                        # Draw and score the lead with what survived the calibration check
+                        keypoints = self.check_proportions(lead.keypoints, keypoints)
+                        lead.keypoints = keypoints
+                        # Scored once per frame, so every rep counter sees each frame once
+                        self.tracker.score(people)
+                    else:
+                        keypoints = np.zeros((17, 3))
+                        self.model.keypoints = keypoints
+                else:
+                    keypoints = self.check_proportions(self.model.detect_pose(frame), keypoints)
+                self.motion_gate.observe(keypoints)
+            
+            if self.record_session:
+                # Keep an undrawn copy for the recording
+                raw_frame = self.frame_pool.acquire()
+                if raw_frame is not None and raw_frame.shape == frame.shape:
+                    np.copyto(raw_frame, frame)
+                else:
+                    if raw_frame is not None:
+                        self.frame_pool.release(raw_frame)
+                    raw_frame = frame.copy()
             
             # Draw keypoints on the frame
-            frame = self.draw_keypoints(frame, keypoints)
+            if self.multi_person:
+                draw_people(frame, people)
+                self.people_update.emit([person.summary() for person in people])
+            else:
+                frame = draw_keypoints(frame, keypoints)
             
             # Calculate angles and accuracy
             angles = self.model.calculate_angles()
             accuracy = self.model.calculate_accuracy(self.reference_angles)
-            feedback = self.model.get_feedback()
+            feedback = self.model.get_feedback(self.feedback_engine, self.calibration)
+            if self.cues is not None:
+                self.cues.submit(feedback)
+            # History runs on the wall clock, media time stands still while the trainer video is paused
+            now = time.monotonic()
+            self.history.append(now, keypoints, angles)
+            if self.auto_exercise:
+                detected = self.classifier.update(self.history)
+                if detected and detected != self.exercise:
+                    self.set_exercise(detected)
+                    self.exercise_detected.emit(detected)
             
             # Determine posture status
             overall_accuracy = accuracy['Overall']
@@ -120,70 +311,118 @@ class VideoThread(QThread):
             else:
                 status = 'INCORRECT'
             
+            if self.record_session:
+                if self.recorder is None:
+                    self.open_recorder(cap, frame)
+                self.recorder.record(raw_frame, keypoints.copy(), angles, accuracy, timestamp)
+                if self.recorder.duration >= self.session_minutes * 60:
+                    self.close_recorder()
+            if self.analytics is not None:
+                self.record_analytics(angles, overall_accuracy, now)
+            if self.publisher is not None:
+                self.publisher.publish(timestamp, keypoints, angles, overall_accuracy, status)
+            
             # Emit signals with processed data
-            self.frame_update.emit(frame)
+            self.frame_update.emit(frame, timestamp)
             self.pose_update.emit(angles, accuracy, feedback, status)
             
+            self.frames_processed += 1
+            
             # Sleep to control frame rate
-            self.msleep(30)  # ~30 fps
+            self.msleep(self.frame_interval)  # ~30 fps by default
             
         cap.release()
+        self.close_recorder()
+        if self.publisher is not None:
+            self.publisher.close()
+            self.publisher = None
+        if self.analytics is not None:
+            self.analytics.end_session(self.analytics_session)
+        
+    def check_proportions(self, detected, previous):
+        """
+        Feed calibration, or drop keypoints that violate the calibrated proportions.
+        A detection that is implausible as a whole is discarded for the previous one.
+        Returns the keypoints to score, which are also set on the model.
+        """
+        keypoints = detected
+        if self.calibrator is not None:
+            if self.calibrator.add(detected):
+                self.calibration = self.calibrator.finish()
+                self.calibration.save(self.calibration_path)
+                self.calibrator = None
+                self.calibration_finished.emit(self.calibration_path)
+        elif self.calibration is not None:
+            filtered, plausible = self.calibration.filter(detected)
+            keypoints = previous if not plausible and previous is not None else filtered
+        # Feedback rules are evaluated on the model's keypoints
+        self.model.keypoints = keypoints
+        return keypoints
+        
+    def record_analytics(self, angles, overall_accuracy, now):
+        """
+        Queue this frame's metrics and any completed rep for the analytics store.
+        `now` is the frame's time on the history's monotonic clock.
+        """
+        self.analytics.record_frame(self.analytics_session, overall_accuracy, angles)
+        
+        name, low, high = REP_ANGLES[self.exercise]
+        if name in angles and not self.rep_counter.down and angles[name] > high:
+            # Still resting at the top: the next rep starts once the angle leaves it
+            self.rep_accuracy.clear()
+        else:
+            self.rep_accuracy.append((now, overall_accuracy))
+        
+        if name in angles and self.rep_counter.update(angles[name]):
+            reps = self.history.reps(name, low, high)
+            if len(reps):
+                started_at, ended_at, min_angle, max_angle, _ = reps[-1]
+                # The history's segment also covers any rest before the rep, the buffer does not
+                started_at = max(started_at, self.rep_accuracy[0][0])
+                # Rep times are on the history's monotonic clock, store them as wall time
+                offset = time.time() - time.monotonic()
+                self.analytics.record_rep(
+                    self.analytics_session, started_at + offset, ended_at + offset,
+                    float(min_angle), float(max_angle), float(np.mean([acc for _, acc in self.rep_accuracy]))
+                )
+            self.rep_accuracy.clear()
+        
+    def pipeline_stats(self):
+        """Snapshot of the capture pipeline's buffer usage and inference skipping, safe to call from any thread"""
+        return {
+            'frames_processed': self.frames_processed,
+            'frame_pool': self.frame_pool.stats() if self.frame_pool is not None else {},
+            'motion_gate': self.motion_gate.stats()
+        }
         
     def stop(self):
         """Stop the thread"""
         self.running = False
         self.wait()
         
-    def draw_keypoints(self, frame, keypoints):
-        """
-        Draw keypoints and connections on the frame
-        In a real implementation, this would draw actual keypoints from MoveNet
-        """
-        h, w, _ = frame.shape
-        
-        # Define keypoint connections (pairs of indices)
-        connections = [
-            (0, 1), (0, 2), (1, 3), (2, 4),  # Head to shoulders to elbows
-            (3, 5), (4, 6),  # Elbows to wrists
-            (5, 7), (7, 9), (6, 8), (8, 10),  # Arms to hands
-            (5, 6), (5, 11), (6, 12),  # Shoulders to hips
-            (11, 12), (11, 13), (12, 14),  # Hips to knees
-            (13, 15), (14, 16)  # Knees to ankles
-        ]
-        
-        # Colors for different body parts
-        colors = [
-            (255, 0, 0),    # Red - Head
-            (255, 85, 0),   # Orange - Shoulders
-            (255, 170, 0),  # Yellow-Orange - Arms
-            (255, 255, 0),  # Yellow - Hands
-            (170, 255, 0),  # Yellow-Green - Torso
-            (85, 255, 0),   # Light Green - Hips
-            (0, 255, 0),    # Green - Upper Legs
-            (0, 255, 85),   # Green-Cyan - Lower Legs
-            (0, 255, 170),  # Cyan - Feet
-        ]
+class SessionExportThread(QThread):
+    """Thread that renders a session comparison video without blocking the UI"""
+    progress = pyqtSignal(int)
+    export_finished = pyqtSignal(str)
+    export_failed = pyqtSignal(str)
+    
+    def __init__(self, session_dir, output_path, trainer_path=None):
+        super().__init__()
+        self.session_dir = session_dir
+        self.output_path = output_path
+        self.trainer_path = trainer_path
         
-        # Draw keypoints
-        for i, (y, x, confidence) in enumerate(keypoints):
-            if confidence > 0.5:  # Only draw keypoints with confidence > 0.4
-                x_px = int(x * w)
-                y_px = int(y * h)
-                color_idx = min(i // 2, len(colors) - 1)
-                cv2.circle(frame, (x_px, y_px), 5, colors[color_idx], -1)
-        
-        # Draw connections
-        for connection in connections:
-            start_idx, end_idx = connection
-            if (keypoints[start_idx][2] > 0.4 and keypoints[end_idx][2] > 0.4):
-                x1 = int(keypoints[start_idx][1] * w)
-                y1 = int(keypoints[start_idx][0] * h)
-                x2 = int(keypoints[end_idx][1] * w)
-                y2 = int(keypoints[end_idx][0] * h)
-                color_idx = min(start_idx // 2, len(colors) - 1)
-                cv2.line(frame, (x1, y1), (x2, y2), colors[color_idx], 2)
-                
-        return frame
+    def run(self):
+        """Render the session in a background process pool"""
+        try:
+            export_session(
+                self.session_dir, self.output_path, self.trainer_path,
+                progress=lambda done, total: self.progress.emit(int(done * 100 / total))
+            )
+        except Exception as e:
+            self.export_failed.emit(str(e))
+            return
+        self.export_finished.emit(self.output_path)
 
 class CircularProgressBar(QWidget):
     """Custom circular progress bar widget"""
@@ -234,10 +473,18 @@ class CircularProgressBar(QWidget):
 
 class WorkoutTrainerUI(QMainWindow):
     """Main UI class for the AI Workout Trainer application"""
-    def __init__(self):
+    def __init__(self, profile_seconds=None, multi_person=False, publish_name=None, audio=True,
+                 capture_factory=cv2.VideoCapture, frame_interval=30, record_session=True):
         super().__init__()
+        self.multi_person = multi_person
+        self.publish_name = publish_name
+        self.audio = audio
+        self.capture_factory = capture_factory
+        self.frame_interval = frame_interval
+        self.record_session = record_session
         self.initUI()
         self.initCamera()
+        self.initProfiler(profile_seconds)
         
     def initUI(self):
         """Initialize the UI components"""
@@ -310,8 +557,14 @@ class WorkoutTrainerUI(QMainWindow):
         self.exercise_combo.addItems(["Squats", "Push-ups", "Lunges"])
         self.exercise_combo.currentTextChanged.connect(self.change_exercise)
         
+        self.auto_exercise_check = QCheckBox("Auto-detect")
+        self.auto_exercise_check.setChecked(True)
+        self.auto_exercise_check.setStyleSheet("color: #A0AEC0;")
+        self.auto_exercise_check.toggled.connect(self.toggle_auto_exercise)
+        
         header_layout.addWidget(title_label)
         header_layout.addStretch()
+        header_layout.addWidget(self.auto_exercise_check)
         header_layout.addWidget(self.exercise_combo)
         
         main_layout.addWidget(header_frame)
@@ -340,6 +593,11 @@ class WorkoutTrainerUI(QMainWindow):
         # Video controls
         controls_layout = QHBoxLayout()
         
+        self.speed_combo = QComboBox()
+        self.speed_combo.addItems(["0.25x", "0.5x", "1x", "1.5x", "2x"])
+        self.speed_combo.setCurrentText("1x")
+        self.speed_combo.currentTextChanged.connect(self.set_playback_rate)
+        
         self.play_button = QPushButton("Play")
         self.play_button.clicked.connect(self.play_video)
         
@@ -356,9 +614,15 @@ class WorkoutTrainerUI(QMainWindow):
         controls_layout.addWidget(self.pause_button)
         controls_layout.addWidget(self.prev_button)
         controls_layout.addWidget(self.next_button)
+        controls_layout.addWidget(self.speed_combo)
         
         trainer_layout.addWidget(self.upload_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        # Scrub timeline with thumbnails and the accuracy heat strip
+        self.trainer_timeline = TrainerTimeline(os.path.join(DATA_DIR, 'thumbnails'))
+        self.trainer_timeline.seek_requested.connect(self.seek_trainer)
+        
         trainer_layout.addWidget(self.trainer_video_area)
+        trainer_layout.addWidget(self.trainer_timeline)
         trainer_layout.addLayout(controls_layout)
         
         # Trainee video section
@@ -381,7 +645,18 @@ class WorkoutTrainerUI(QMainWindow):
         
         trainee_layout.addWidget(trainee_label)
         trainee_layout.addWidget(self.trainee_video_area)
+        self.export_button = QPushButton("Export Session")
+        self.export_button.setIcon(QIcon.fromTheme("document-save"))
+        self.export_button.clicked.connect(self.export_session)
+        
+        self.calibrate_button = QPushButton("Recalibrate" if os.path.exists(
+            os.path.join(DATA_DIR, 'calibration', f"{USER_ID}.json")) else "Calibrate")
+        self.calibrate_button.setToolTip("Stand still, facing the camera, for two seconds")
+        self.calibrate_button.clicked.connect(self.calibrate)
+        
         trainee_layout.addWidget(self.reset_button)
+        trainee_layout.addWidget(self.calibrate_button)
+        trainee_layout.addWidget(self.export_button)
         
         # Posture accuracy section
         posture_frame = self.create_panel()
@@ -406,6 +681,13 @@ class WorkoutTrainerUI(QMainWindow):
         posture_layout.addWidget(status_title)
         posture_layout.addWidget(self.status_value)
         
+        # Per-person summary, only shown for group classes
+        self.group_label = QLabel()
+        self.group_label.setStyleSheet("color: #A0AEC0;")
+        self.group_label.setWordWrap(True)
+        self.group_label.hide()
+        posture_layout.addWidget(self.group_label)
+        
         # Joint angles section
         angles_frame = self.create_panel()
         angles_layout = QVBoxLayout(angles_frame)
@@ -495,6 +777,21 @@ class WorkoutTrainerUI(QMainWindow):
         self.trainer_video_playing = False
         self.current_frame = 0
         self.total_frames = 0
+        self.trainer_fps = 30.0
+        # Index of the frame the next trainer_video.read() will return
+        self.decode_position = 0
+        
+        # One clock drives trainer playback and stamps trainee frames
+        self.media_clock = MediaClock()
+        self.trainee_timestamp = 0.0
+        self.display_pool = None
+        
+        # Session export state
+        self.export_path = None
+        self.export_thread = None
+        self.play_timer = QTimer(self)
+        self.play_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.play_timer.timeout.connect(self.advance_trainer_video)
         
     def create_panel(self):
         """Helper method to create a styled panel"""
@@ -508,16 +805,65 @@ class WorkoutTrainerUI(QMainWindow):
     
     def initCamera(self):
         """Initialize the camera thread"""
-        self.video_thread = VideoThread()
+        self.analytics = AnalyticsStore(os.path.join(DATA_DIR, 'analytics.db'))
+        self.cues = None
+        if self.audio:
+            self.cues = CueScheduler(os.path.join(DATA_DIR, 'cues'))
+            # Render every rule message ahead of time so cues play without synthesis delay
+            self.cues.precache({rule['text'] for name in REFERENCE_ANGLES for rule in exercise_rules(name)})
+        self.video_thread = VideoThread(clock=self.media_clock, analytics=self.analytics,
+                                        multi_person=self.multi_person, publish_name=self.publish_name,
+                                        cues=self.cues, capture_factory=self.capture_factory,
+                                        frame_interval=self.frame_interval, record_session=self.record_session)
         self.video_thread.frame_update.connect(self.update_trainee_frame)
         self.video_thread.pose_update.connect(self.update_pose_data)
+        self.video_thread.people_update.connect(self.update_people)
+        self.video_thread.exercise_detected.connect(self.show_detected_exercise)
+        self.video_thread.calibration_finished.connect(self.finish_calibration)
+        self.video_thread.session_closed.connect(self.start_session_export)
         self.video_thread.start()
         
-    @pyqtSlot(np.ndarray)
-    def update_trainee_frame(self, frame):
+    def initProfiler(self, profile_seconds=None):
+        """Set up on-demand profiling: F9 at any time, or right away when requested at startup"""
+        self.profiler = None
+        self.profile_seconds = profile_seconds or 10.0
+        self.profile_shortcut = QShortcut(QKeySequence("F9"), self)
+        self.profile_shortcut.activated.connect(self.start_profiling)
+        if profile_seconds:
+            # Give the capture thread a moment to reach its loop
+            QTimer.singleShot(1000, self.start_profiling)
+            
+    @pyqtSlot()
+    def start_profiling(self):
+        """Sample the GUI and capture threads and write a flame-graph profile"""
+        if self.profiler is not None and self.profiler.running:
+            return
+        gui_ident = threading.get_ident()
+        profile = self.video_thread.capture_profile or {}
+        self.profiler = SamplingProfiler(
+            lambda: {'gui': gui_ident, 'video': self.video_thread.thread_ident},
+            os.path.join(DATA_DIR, 'profiles'),
+            duration=self.profile_seconds,
+            tags={
+                'exercise': self.video_thread.exercise,
+                'capture': f"{profile.get('width', 0)}x{profile.get('height', 0)}@{profile.get('fps', 0):.0f}"
+            },
+            on_finished=lambda path: print(f"Profile written to {path}")
+        )
+        print(f"Profiling for {self.profile_seconds:.0f}s...")
+        self.profiler.start()
+        
+    @pyqtSlot(np.ndarray, float)
+    def update_trainee_frame(self, frame, timestamp):
         """Update the trainee video display with the latest frame"""
-        # Convert the frame from BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Media time of this frame, i.e. the trainer moment it should be compared against
+        self.trainee_timestamp = timestamp
+        
+        # Convert the frame from BGR to RGB into a pooled buffer
+        if self.display_pool is None or self.display_pool.shape != frame.shape:
+            self.display_pool = FramePool(frame.shape, 2)
+        rgb_buffer = self.display_pool.acquire()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buffer)
         h, w, ch = rgb_frame.shape
         
         # Convert the frame to QImage
@@ -532,6 +878,11 @@ class WorkoutTrainerUI(QMainWindow):
             Qt.AspectRatioMode.KeepAspectRatio
         ))
         
+        # The pixmap holds its own copy, both buffers can be reused
+        self.display_pool.release(rgb_frame)
+        if self.video_thread.frame_pool is not None:
+            self.video_thread.frame_pool.release(frame)
+        
     @pyqtSlot(dict, dict, list, str)
     def update_pose_data(self, angles, accuracy, feedback, status):
         """Update the UI with the latest pose data"""
@@ -556,6 +907,10 @@ class WorkoutTrainerUI(QMainWindow):
                 else:
                     self.joint_progress_bars[joint].setStyleSheet("QProgressBar::chunk { background-color: #F56565; }")
         
+        # Score the trainer moment this pose was compared against
+        if self.trainer_video_playing and 'Overall' in accuracy:
+            self.trainer_timeline.add_accuracy(self.trainee_timestamp, accuracy['Overall'])
+            
         # Update status
         self.status_value.setText(status)
         if status == 'CORRECT':
@@ -565,11 +920,22 @@ class WorkoutTrainerUI(QMainWindow):
         else:
             self.status_value.setStyleSheet("font-size: 24px; font-weight: bold; color: #F56565; text-align: center;")
             
-        # Update feedback
-        self.update_feedback(feedback)
+        # Update feedback only when the messages change, rebuilding the widgets is not free
+        if feedback != self.current_feedback:
+            self.update_feedback(feedback)
+        
+    @pyqtSlot(list)
+    def update_people(self, people):
+        """Show accuracy and reps of every tracked person"""
+        self.group_label.setText("   ".join(
+            f"#{p['id']}: {p['accuracy'].get('Overall', 0)}% · {p['reps']} reps" for p in people
+        ))
+        self.group_label.show()
         
     def update_feedback(self, feedback_items):
         """Update the feedback section with new items"""
+        self.current_feedback = list(feedback_items)
+        
         # Clear existing feedback items (except the title)
         for i in reversed(range(1, self.feedback_layout.count())):
             item = self.feedback_layout.itemAt(i)
@@ -615,64 +981,133 @@ class WorkoutTrainerUI(QMainWindow):
         )
         
         if file_name:
-            self.trainer_video_path = file_name
-            self.trainer_video = cv2.VideoCapture(file_name)
-            self.total_frames = int(self.trainer_video.get(cv2.CAP_PROP_FRAME_COUNT))
-            self.current_frame = 0
+            self.load_trainer_video(file_name)
             
-            # Display the first frame
-            self.show_trainer_frame()
+    def load_trainer_video(self, file_name):
+        """Open a trainer video and show its first frame"""
+        self.pause_video()
+        self.trainer_video_path = file_name
+        self.trainer_video = cv2.VideoCapture(file_name)
+        self.total_frames = int(self.trainer_video.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.trainer_fps = self.trainer_video.get(cv2.CAP_PROP_FPS) or 30.0
+        self.current_frame = 0
+        self.media_clock.seek(0)
+        self.trainer_timeline.set_video(file_name, self.total_frames, self.trainer_fps)
+        
+        # Display the first frame
+        self.show_trainer_frame()
             
     def show_trainer_frame(self):
-        """Display the current frame of the trainer video"""
+        """Seek to and display the current frame of the trainer video"""
         if self.trainer_video and self.trainer_video.isOpened():
             self.trainer_video.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
-            ret, frame = self.trainer_video.read()
+            self.decode_position = self.current_frame
+            self.read_trainer_frame()
             
-            if ret:
-                # Convert the frame from BGR to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_frame.shape
-                
-                # Convert the frame to QImage
-                bytes_per_line = ch * w
-                image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                
-                # Scale the image to fit the label while maintaining aspect ratio
-                pixmap = QPixmap.fromImage(image)
-                self.trainer_video_area.setPixmap(pixmap.scaled(
-                    self.trainer_video_area.width(),
-                    self.trainer_video_area.height(),
-                    Qt.AspectRatioMode.KeepAspectRatio
-                ))
-            else:
-                # If we've reached the end of the video, reset to the beginning
+    def read_trainer_frame(self):
+        """Decode the next trainer frame and display it"""
+        ret, frame = self.trainer_video.read()
+        if not ret:
+            # Out of decodable frames, often before the reported frame count: loop back to
+            # the start like advance_trainer_video, leaving the play/pause state alone
+            if self.decode_position > 0:
+                self.total_frames = min(self.total_frames, self.decode_position)
                 self.current_frame = 0
-                self.trainer_video_playing = False
-                
+                self.media_clock.seek(0)
+                self.show_trainer_frame()
+            return
+        self.decode_position += 1
+        
+        # Convert the frame from BGR to RGB
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w, ch = rgb_frame.shape
+        
+        # Convert the frame to QImage
+        bytes_per_line = ch * w
+        image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+        
+        # Scale the image to fit the label while maintaining aspect ratio
+        pixmap = QPixmap.fromImage(image)
+        self.trainer_video_area.setPixmap(pixmap.scaled(
+            self.trainer_video_area.width(),
+            self.trainer_video_area.height(),
+            Qt.AspectRatioMode.KeepAspectRatio
+        ))
+        self.trainer_timeline.set_position(self.current_frame)
+        
+    @pyqtSlot()
+    def advance_trainer_video(self):
+        """Show the trainer frame due at the current media time, dropping or repeating frames as needed"""
+        if not (self.trainer_video and self.trainer_video.isOpened()) or self.total_frames <= 0:
+            return
+        
+        target = self.media_clock.frame_at(self.media_clock.now(), self.trainer_fps)
+        if target >= self.total_frames:
+            # Loop back to the start of the video
+            self.media_clock.seek(0)
+            self.current_frame = 0
+            self.show_trainer_frame()
+            return
+        if target == self.current_frame:
+            # Ahead of the clock: keep showing the current frame
+            return
+        
+        self.current_frame = target
+        if target < self.decode_position or target - self.decode_position > self.trainer_fps:
+            # Backwards or far ahead, a seek is cheaper than decoding through
+            self.show_trainer_frame()
+            return
+        
+        # Behind the clock: skip the late frames without decoding them
+        while self.decode_position < target:
+            if not self.trainer_video.grab():
+                break
+            self.decode_position += 1
+        self.read_trainer_frame()
+        
+    def update_play_timer(self):
+        """Tick once per trainer frame at the current playback rate"""
+        interval = 1000.0 / (self.trainer_fps * self.media_clock.rate)
+        self.play_timer.setInterval(max(1, int(interval)))
+        
     @pyqtSlot()
     def play_video(self):
         """Play the trainer video"""
         if self.trainer_video and self.trainer_video.isOpened():
             self.trainer_video_playing = True
-            
-            # Use a timer to advance frames
-            self.play_timer = QTimer(self)
-            self.play_timer.timeout.connect(self.next_frame)
-            self.play_timer.start(33)  # ~30 fps
+            self.media_clock.seek(self.current_frame / self.trainer_fps)
+            self.media_clock.start()
+            self.update_play_timer()
+            self.play_timer.start()
             
     @pyqtSlot()
     def pause_video(self):
         """Pause the trainer video"""
         self.trainer_video_playing = False
-        if hasattr(self, 'play_timer'):
-            self.play_timer.stop()
+        self.media_clock.pause()
+        self.play_timer.stop()
+        
+    @pyqtSlot(str)
+    def set_playback_rate(self, text):
+        """Change the trainer playback rate, e.g. for slow-motion demos"""
+        self.media_clock.set_rate(float(text.rstrip('x')))
+        if self.play_timer.isActive():
+            self.update_play_timer()
+            
+    @pyqtSlot(int)
+    def seek_trainer(self, frame_index):
+        """Jump to a frame picked on the timeline"""
+        if self.trainer_video and self.trainer_video.isOpened():
+            self.current_frame = frame_index
+            self.media_clock.seek(frame_index / self.trainer_fps)
+            self.show_trainer_frame()
             
     @pyqtSlot()
     def next_frame(self):
         """Advance to the next frame"""
         if self.trainer_video and self.trainer_video.isOpened():
             self.current_frame = (self.current_frame + 1) % self.total_frames
+            self.media_clock.seek(self.current_frame / self.trainer_fps)
             self.show_trainer_frame()
             
     @pyqtSlot()
@@ -680,36 +1115,132 @@ class WorkoutTrainerUI(QMainWindow):
         """Go back to the previous frame"""
         if self.trainer_video and self.trainer_video.isOpened():
             self.current_frame = (self.current_frame - 1) % self.total_frames
+            self.media_clock.seek(self.current_frame / self.trainer_fps)
             self.show_trainer_frame()
             
+    @pyqtSlot()
+    def export_session(self):
+        """Close the current session and export it as a comparison video"""
+        if self.export_thread is not None and self.export_thread.isRunning():
+            return
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Session Video",
+            "session.mp4",
+            "Video Files (*.mp4)"
+        )
+        if file_name:
+            self.export_path = file_name
+            self.export_button.setEnabled(False)
+            self.export_button.setText("Finishing session...")
+            # The capture thread closes the recording and answers with session_closed
+            self.video_thread.send('close_session')
+            
+    @pyqtSlot(str)
+    def start_session_export(self, session_dir):
+        """Render a closed session if an export was requested"""
+        if not self.export_path:
+            return
+        self.export_thread = SessionExportThread(session_dir, self.export_path, self.trainer_video_path)
+        self.export_thread.progress.connect(self.update_export_progress)
+        self.export_thread.export_finished.connect(self.finish_session_export)
+        self.export_thread.export_failed.connect(self.finish_session_export)
+        self.export_path = None
+        self.export_thread.start()
+        
+    @pyqtSlot(int)
+    def update_export_progress(self, percent):
+        """Show export progress on the export button"""
+        self.export_button.setText(f"Exporting... {percent}%")
+        
+    @pyqtSlot(str)
+    def finish_session_export(self, message):
+        """Re-enable exporting once the render is done or has failed"""
+        print(f"Session export: {message}")
+        self.export_button.setText("Export Session")
+        self.export_button.setEnabled(True)
+        
     @pyqtSlot()
     def reset_camera(self):
         """Reset the camera feed"""
-        if self.video_thread.isRunning():
-            self.video_thread.stop()
-            
-        # Restart the video thread
-        self.video_thread = VideoThread()
-        self.video_thread.frame_update.connect(self.update_trainee_frame)
-        self.video_thread.pose_update.connect(self.update_pose_data)
-        self.video_thread.start()
+        # Re-open the source in place; the thread and model stay alive
+        self.video_thread.send('source', self.video_thread.camera_id)
+        self.video_thread.send('resume')
+        if not self.video_thread.isRunning():
+            self.video_thread.start()
         
     @pyqtSlot(str)
     def change_exercise(self, exercise):
         """Change the current exercise"""
-        print(f"Changed exercise to: {exercise}")
-        # In a real implementation, this would load reference poses for the selected exercise
+        # Applied by the capture thread between frames
+        self.video_thread.send('exercise', exercise)
+        
+    @pyqtSlot(bool)
+    def toggle_auto_exercise(self, enabled):
+        """Turn automatic exercise recognition on or off"""
+        self.video_thread.send('auto_exercise', enabled)
+        
+    @pyqtSlot(str)
+    def show_detected_exercise(self, exercise):
+        """Reflect an automatically detected exercise in the selector"""
+        # The capture thread already switched, don't echo the change back
+        self.exercise_combo.blockSignals(True)
+        self.exercise_combo.setCurrentText(exercise)
+        self.exercise_combo.blockSignals(False)
+        
+    def calibrate(self):
+        """Measure the user's body proportions from a short standing capture"""
+        self.calibrate_button.setEnabled(False)
+        self.calibrate_button.setText("Calibrating... hold still")
+        self.video_thread.send('calibrate')
+        
+    @pyqtSlot(str)
+    def finish_calibration(self, path):
+        """Re-enable calibration once the profile has been saved"""
+        self.calibrate_button.setEnabled(True)
+        self.calibrate_button.setText("Recalibrate")
+        print(f"Calibration saved to {path}")
         
     def closeEvent(self, event):
         """Handle window close event"""
         # Stop the video thread when the window is closed
         if self.video_thread.isRunning():
             self.video_thread.stop()
+        self.analytics.close()
+        self.trainer_timeline.stop()
+        if self.cues is not None:
+            self.cues.close()
         event.accept()
 
+def parse_args(argv):
+    """Parse our own options, leaving the rest for Qt"""
+    parser = argparse.ArgumentParser(description="AI Workout Trainer")
+    parser.add_argument(
+        "--profile", nargs="?", type=float, const=10.0,
+        default=float(os.environ.get('WORKOUT_TRAINER_PROFILE', 0)) or None,
+        metavar="SECONDS",
+        help="profile the GUI and capture threads at startup (also WORKOUT_TRAINER_PROFILE=SECONDS, or F9 at runtime)"
+    )
+    parser.add_argument(
+        "--multi-person", action="store_true",
+        help="track everyone in front of the camera with stable IDs (group classes)"
+    )
+    parser.add_argument(
+        "--publish", nargs="?", const=DEFAULT_POSE_STREAM, default=None, metavar="NAME",
+        help="publish every frame's pose to a shared-memory stream other local processes can read"
+    )
+    parser.add_argument(
+        "--mute", action="store_true",
+        help="disable spoken coaching cues"
+    )
+    args, qt_args = parser.parse_known_args(argv[1:])
+    return args, argv[:1] + qt_args
+
 def main():
-    app = QApplication(sys.argv)
-    window = WorkoutTrainerUI()
+    args, qt_argv = parse_args(sys.argv)
+    app = QApplication(qt_argv)
+    window = WorkoutTrainerUI(profile_seconds=args.profile, multi_person=args.multi_person,
+                              publish_name=args.publish, audio=not args.mute)
     window.show()
     sys.exit(app.exec())
 
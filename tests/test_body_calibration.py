@@ -0,0 +1,71 @@
+import numpy as np
+
+from body_calibration import BodyCalibrator, CalibrationProfile
+
+ASPECT = 4 / 3
+
+# Front-facing standing skeleton, [y, x] normalized to the frame
+STANDING = np.array([
+    [0.10, 0.50], [0.09, 0.51], [0.09, 0.49], [0.10, 0.52], [0.10, 0.48],
+    [0.25, 0.56], [0.25, 0.44],     # shoulders
+    [0.40, 0.58], [0.40, 0.42],     # elbows
+    [0.52, 0.58], [0.52, 0.42],     # wrists
+    [0.55, 0.54], [0.55, 0.46],     # hips
+    [0.73, 0.54], [0.73, 0.46],     # knees
+    [0.91, 0.54], [0.91, 0.46]      # ankles
+])
+
+
+def with_scores(points, score=0.9):
+    return np.column_stack([points, np.full(len(points), score)])
+
+
+def calibrated_profile(tmp_path):
+    rng = np.random.default_rng(0)
+    calibrator = BodyCalibrator('user', ASPECT, frames=30)
+    while not calibrator.add(with_scores(STANDING + rng.normal(0, 0.002, STANDING.shape))):
+        pass
+    path = str(tmp_path / 'calibration' / 'user.json')
+    calibrator.finish().save(path)
+    return CalibrationProfile.load(path)
+
+
+def test_standing_pose_passes(tmp_path):
+    profile = calibrated_profile(tmp_path)
+    keypoints = with_scores(STANDING)
+    filtered, plausible = profile.filter(keypoints)
+    assert plausible
+    np.testing.assert_array_equal(filtered, keypoints)
+
+
+def test_foreshortened_thighs_are_kept(tmp_path):
+    # Front-facing squat: thighs point at the camera and project at 60% of their length
+    profile = calibrated_profile(tmp_path)
+    squat = STANDING.copy()
+    squat[11:, 0] -= 0.1
+    squat[13:15, 0] = squat[11:13, 0] + 0.6 * (STANDING[13:15, 0] - STANDING[11:13, 0])
+    squat[15:17, 0] = squat[13:15, 0] + (STANDING[15:17, 0] - STANDING[13:15, 0])
+    filtered, plausible = profile.filter(with_scores(squat))
+    assert plausible
+    assert np.all(filtered[:, 2] > 0)
+
+
+def test_overlong_segment_is_rejected(tmp_path):
+    profile = calibrated_profile(tmp_path)
+    keypoints = with_scores(STANDING)
+    keypoints[15, 0] = 1.3   # left ankle far below the knee
+    filtered, plausible = profile.filter(keypoints)
+    assert plausible
+    assert filtered[15, 2] == 0
+    assert np.count_nonzero(filtered[:, 2] == 0) == 1
+
+
+def test_normalize_centres_on_hips_with_unit_torso(tmp_path):
+    profile = calibrated_profile(tmp_path)
+    # Same pose, further from the camera: half the size
+    far = with_scores(0.5 + (STANDING - 0.5) * 0.5)
+    near = profile.normalize(with_scores(STANDING))
+    np.testing.assert_allclose(profile.normalize(far), near, atol=1e-6)
+    np.testing.assert_allclose((near[11] + near[12]) / 2, 0, atol=1e-9)
+    torso = np.linalg.norm(near[5] - near[11])
+    assert abs(torso - 1) < 0.05
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from exercise_classifier import DEFAULT_PROFILES, ExerciseClassifier, window_features
+from pose_history import ANGLE_NAMES, PoseHistory
+
+FPS = 30
+
+
+def profile_angles(profile, seconds=3.0, reps=2, noise=0.0, shoulder=True, seed=0):
+    """(frames, joints) angles of a sinusoidal movement following a profile, optionally noisy"""
+    t = np.linspace(0, 2 * np.pi * reps, int(seconds * FPS))
+    angles = np.stack([mean + rom / 2 * np.sin(t) for mean, rom in profile], axis=1)
+    angles += np.random.default_rng(seed).normal(0, noise, angles.shape)
+    if not shoulder:
+        # calculate_angles does not produce a shoulder angle yet
+        angles[:, ANGLE_NAMES.index('Shoulder')] = np.nan
+    return angles
+
+
+@pytest.mark.parametrize('exercise', list(DEFAULT_PROFILES))
+@pytest.mark.parametrize('shoulder', [True, False])
+@pytest.mark.parametrize('noise', [0.0, 5.0])
+def test_own_profile_is_classified_confidently(exercise, shoulder, noise):
+    classifier = ExerciseClassifier()
+    for seed in range(10):
+        angles = profile_angles(DEFAULT_PROFILES[exercise], noise=noise, shoulder=shoulder, seed=seed)
+        label, confidence = classifier.classify(window_features(angles))
+        assert label == exercise
+        assert confidence >= classifier.min_confidence
+
+
+def test_standing_still_is_not_classified():
+    classifier = ExerciseClassifier()
+    angles = np.full((90, len(ANGLE_NAMES)), 178.0) + np.random.default_rng(0).normal(0, 2, (90, len(ANGLE_NAMES)))
+    assert classifier.classify(window_features(angles)) == (None, 0.0)
+
+
+@pytest.mark.parametrize('exercise', list(DEFAULT_PROFILES))
+def test_update_switches_after_stable_windows(exercise):
+    classifier = ExerciseClassifier()
+    history = PoseHistory(capacity=FPS * 20)
+    angles = profile_angles(DEFAULT_PROFILES[exercise], seconds=10, reps=6, noise=3.0, shoulder=False)
+    detected = []
+    for i, row in enumerate(angles):
+        now = i / FPS
+        history.append(now, np.zeros((17, 3)), dict(zip(ANGLE_NAMES, row)))
+        result = classifier.update(history, now=now)
+        if result:
+            detected.append(result)
+    assert detected == [exercise]
@@ -0,0 +1,64 @@
+import numpy as np
+
+from feedback_rules import FEATURE_INDEX, FEATURE_NAMES, FeedbackRuleEngine, exercise_rules
+
+KNEE_RULE = {
+    'feature': 'Knee', 'op': '>', 'value': 150, 'hysteresis': 5,
+    'text': 'Bend your knee more', 'status': 'warning',
+    'group': 'Knee', 'ok_text': 'Knee angle is correct'
+}
+
+
+def features(knee=np.nan):
+    values = np.full(len(FEATURE_NAMES), np.nan)
+    values[FEATURE_INDEX['Knee']] = knee
+    return values
+
+
+def texts(feedback):
+    return [item['text'] for item in feedback]
+
+
+def feed(engine, *knees):
+    """Evaluate one frame per value; returns the feedback texts and whether the last frame changed them"""
+    for knee in knees:
+        feedback, changed = engine.evaluate(features(knee))
+    return texts(feedback), changed
+
+
+def test_rule_switches_on_after_debounce():
+    engine = FeedbackRuleEngine([KNEE_RULE], window=1, debounce=3)
+    assert texts(engine.feedback) == []
+    assert feed(engine, 140, 140) == ([], False)
+    assert feed(engine, 140) == (['Knee angle is correct'], True)
+    assert feed(engine, 160, 160) == (['Knee angle is correct'], False)
+    assert feed(engine, 160) == (['Bend your knee more'], True)
+
+
+def test_short_spikes_are_ignored():
+    engine = FeedbackRuleEngine([KNEE_RULE], window=1, debounce=3)
+    feed(engine, 140, 140, 140)
+    for _ in range(5):
+        assert feed(engine, 160, 160, 140) == (['Knee angle is correct'], False)
+
+
+def test_hysteresis_keeps_rule_on_near_threshold():
+    engine = FeedbackRuleEngine([KNEE_RULE], window=1, debounce=3)
+    feed(engine, 160, 160, 160)
+    # Below the switch-on value but not past the switch-off value (150 - 5)
+    assert feed(engine, 148, 148, 148, 148) == (['Bend your knee more'], False)
+    assert feed(engine, 140, 140, 140) == (['Knee angle is correct'], True)
+
+
+def test_no_praise_while_unmeasurable():
+    engine = FeedbackRuleEngine([KNEE_RULE], window=1, debounce=3)
+    feed(engine, 140, 140, 140)
+    assert feed(engine, np.nan, np.nan) == (['Knee angle is correct'], False)
+    assert feed(engine, np.nan) == ([], True)
+
+
+def test_exercise_rules_compile():
+    for exercise in ('Squats', 'Push-ups', 'Lunges'):
+        engine = FeedbackRuleEngine(exercise_rules(exercise))
+        feedback, _ = engine.evaluate(features(120))
+        assert all(item['status'] in ('error', 'warning', 'good') for item in feedback)
@@ -0,0 +1,65 @@
+import numpy as np
+
+from pose_history import PoseHistory, RepCounter
+
+
+def knee_angles(reps=3, frames_per_rep=40, noise=0.0, seed=0):
+    """Knee angle going from standing (170) to a deep squat (80) and back, `reps` times"""
+    t = np.linspace(0, 2 * np.pi * reps, reps * frames_per_rep)
+    angles = 125 + 45 * np.cos(t)
+    return angles + np.random.default_rng(seed).normal(0, noise, angles.shape)
+
+
+def test_reps_match_rep_counter():
+    angles = knee_angles(reps=4, noise=8.0)
+    # A few frames where the knee could not be seen
+    angles[[15, 16, 70, 100]] = np.nan
+    history = PoseHistory(capacity=len(angles))
+    counter = RepCounter(100, 160)
+    completed = 0
+    for i, angle in enumerate(angles):
+        history.append(i / 30, np.zeros((17, 3)), {'Knee': angle})
+        completed += counter.update(angle)
+
+    reps = history.reps('Knee', 100, 160)
+    assert completed == counter.count == len(reps) == 4
+    assert np.all(reps[:, 2] < 100)
+    assert np.all(reps[:, 0] < reps[:, 1])
+
+
+def test_rep_counter_holds_on_missing_angle():
+    counter = RepCounter(100, 160)
+    for angle in (170, 90, np.nan, np.nan, 120, np.nan):
+        assert not counter.update(angle)
+    assert counter.down
+    assert counter.update(170)
+    assert counter.count == 1
+
+
+def test_window_after_wrap_around():
+    history = PoseHistory(capacity=10)
+    for i in range(25):
+        keypoints = np.full((17, 3), i, dtype=np.float32)
+        history.append(float(i), keypoints, {'Knee': 100 + i})
+
+    assert len(history) == 10
+    timestamps, keypoints, angles = history.window()
+    np.testing.assert_array_equal(timestamps, np.arange(15, 25))
+    np.testing.assert_array_equal(keypoints[:, 0, 0], np.arange(15, 25))
+    np.testing.assert_array_equal(history.angle('Knee'), 100 + np.arange(15, 25))
+    # Latest frames come back as views into the ring, not copies
+    assert np.shares_memory(timestamps, history._timestamps)
+
+    timestamps, _, angles = history.window(seconds=3.5)
+    np.testing.assert_array_equal(timestamps, [21, 22, 23, 24])
+    np.testing.assert_array_equal(angles[:, history.angle_index['Knee']], [121, 122, 123, 124])
+    assert history.frames(seconds=100) == 10
+
+
+def test_clear_forgets_wrapped_frames():
+    history = PoseHistory(capacity=4)
+    for i in range(6):
+        history.append(float(i), np.zeros((17, 3)), {'Knee': i})
+    history.clear()
+    history.append(10.0, np.zeros((17, 3)), {'Knee': 5})
+    np.testing.assert_array_equal(history.timestamps(), [10.0])
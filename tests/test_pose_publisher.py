@@ -0,0 +1,86 @@
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pytest
+
+from pose_publisher import PosePublisher, PoseSubscriber
+
+
+@pytest.fixture
+def publisher():
+    # Unique per test run, so parallel runs never share a segment
+    publisher = PosePublisher(f"pose_test_{os.getpid()}", slots=8)
+    yield publisher
+    publisher.close()
+
+
+def subscribe(name):
+    """
+    Attach a subscriber in this process. Subscribers stop the resource tracker from
+    following the segment, which here is the publisher's own registration.
+    """
+    subscriber = PoseSubscriber(name)
+    resource_tracker.register(subscriber.shm._name, 'shared_memory')
+    return subscriber
+
+
+def publish(publisher, frame):
+    keypoints = np.full((17, 3), frame, dtype=np.float32)
+    publisher.publish(frame / 30, keypoints, {'Knee': 90 + frame, 'Hip': 120}, 75.0 + frame, 'ADJUST')
+
+
+def test_round_trip(publisher):
+    subscriber = subscribe(publisher.shm.name)
+    try:
+        assert subscriber.read() == []
+        for frame in range(3):
+            publish(publisher, frame)
+
+        frames = subscriber.read()
+        assert [f['frame'] for f in frames] == [0, 1, 2]
+        last = frames[-1]
+        assert last['timestamp'] == pytest.approx(2 / 30)
+        assert last['accuracy'] == 77.0
+        assert last['status'] == 'ADJUST'
+        np.testing.assert_array_equal(last['keypoints'], np.full((17, 3), 2))
+        assert last['angles']['Knee'] == 92 and last['angles']['Hip'] == 120
+        # Angles that were not published come back as NaN
+        assert np.isnan(last['angles']['Shoulder'])
+        assert subscriber.read() == []
+        assert subscriber.missed == 0
+    finally:
+        subscriber.close()
+
+
+def test_late_subscriber_starts_at_newest_frame(publisher):
+    publish(publisher, 0)
+    subscriber = subscribe(publisher.shm.name)
+    try:
+        publish(publisher, 1)
+        assert [f['frame'] for f in subscriber.read()] == [1]
+    finally:
+        subscriber.close()
+
+
+def test_lagging_subscriber_counts_overwritten_frames(publisher):
+    subscriber = subscribe(publisher.shm.name)
+    try:
+        for frame in range(publisher.slots + 5):
+            publish(publisher, frame)
+        frames = subscriber.read()
+        assert [f['frame'] for f in frames] == list(range(5, publisher.slots + 5))
+        assert subscriber.missed == 5
+    finally:
+        subscriber.close()
+
+
+def test_non_stream_segment_is_rejected():
+    shm = shared_memory.SharedMemory(create=True, size=1024)
+    try:
+        with pytest.raises(ValueError):
+            PoseSubscriber(shm.name)
+    finally:
+        resource_tracker.register(shm._name, 'shared_memory')
+        shm.close()
+        shm.unlink()
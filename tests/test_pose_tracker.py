@@ -0,0 +1,69 @@
+import numpy as np
+
+from pose_tracker import PoseTracker, joint_angles
+
+# Front-facing standing skeleton centred on x = 0.5, [y, x] normalized to the frame
+STANDING = np.array([
+    [0.10, 0.50], [0.09, 0.51], [0.09, 0.49], [0.10, 0.52], [0.10, 0.48],
+    [0.25, 0.56], [0.25, 0.44],
+    [0.40, 0.58], [0.40, 0.42],
+    [0.52, 0.58], [0.52, 0.42],
+    [0.55, 0.54], [0.55, 0.46],
+    [0.73, 0.54], [0.73, 0.46],
+    [0.91, 0.54], [0.91, 0.46]
+])
+REFERENCE = {'Hip': 120, 'Knee': 145, 'Elbow': 90}
+
+
+def person(x, score=0.9):
+    """Standing skeleton centred at `x`"""
+    points = STANDING + [0.0, x - 0.5]
+    return np.column_stack([points, np.full(len(points), score)])
+
+
+def test_ids_follow_people_regardless_of_detection_order():
+    tracker = PoseTracker('Squats', REFERENCE)
+    rng = np.random.default_rng(0)
+    first = None
+    for frame in range(30):
+        # Two people walking towards each other, detected in a random order
+        left, right = person(0.25 + 0.003 * frame), person(0.75 - 0.003 * frame)
+        detections = np.stack([left, right] if rng.random() < 0.5 else [right, left])
+        people = tracker.update(detections)
+        assert len(people) == 2
+        by_side = {p.keypoints[0, 1] < 0.5: p.id for p in people}
+        if first is None:
+            first = by_side
+        assert by_side == first
+    assert tracker.next_id == 3
+
+
+def test_id_survives_short_occlusion():
+    tracker = PoseTracker('Squats', REFERENCE, max_misses=5)
+    (tracked,) = tracker.update(person(0.5)[None])
+    for _ in range(5):
+        assert tracker.update(np.empty((0, 17, 3))) == []
+    (again,) = tracker.update(person(0.51)[None])
+    assert again.id == tracked.id
+
+    for _ in range(6):
+        tracker.update(np.empty((0, 17, 3)))
+    (new,) = tracker.update(person(0.5)[None])
+    assert new.id != tracked.id
+
+
+def test_low_confidence_detections_are_not_tracked():
+    tracker = PoseTracker('Squats', REFERENCE)
+    assert tracker.update(person(0.5, score=0.1)[None]) == []
+    assert tracker.tracks == []
+
+
+def test_hidden_joints_are_left_out_of_scoring():
+    tracker = PoseTracker('Squats', REFERENCE)
+    keypoints = person(0.5)
+    keypoints[[13, 14], 2] = 0.0   # knees not visible
+    (tracked,) = tracker.update(keypoints[None])
+    assert np.isnan(joint_angles(keypoints[None])[0, 1])
+    assert 'Knee' not in tracked.angles and 'Knee' not in tracked.accuracy
+    assert 'Hip' not in tracked.angles
+    assert tracked.accuracy['Overall'] == tracked.accuracy['Elbow']